@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Débit d'un service (user ou booking) en STORAGE=sqlite selon le nombre de workers gunicorn.
+SERVICES = {
+    "user": {"dir": ROOT / "user", "app": "user:app"},
+    "booking": {"dir": ROOT / "booking", "app": "booking:app"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def port_in_use(port: int) -> bool:
+    with socket.socket() as s:
+        return s.connect_ex(("127.0.0.1", port)) == 0
+
+
+def wait_for_port(port: int, timeout: float = 20.0, proc: Optional[subprocess.Popen] = None) -> None:
+    """Attend que le port accepte des connexions ; échoue tout de suite si `proc` s'est arrêté
+    (sinon un autre programme déjà sur le port passerait pour le service lancé)."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"process exited with code {proc.returncode} before listening on port {port}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"service did not start on port {port}")
+
+
+def load_ids(service_dir: Path, service: str) -> List[str]:
+    if service == "user":
+        with (service_dir / "data" / "users.json").open(encoding="utf-8") as f:
+            return [u["id"] for u in json.load(f)["users"]]
+    with (service_dir / "data" / "bookings.json").open(encoding="utf-8") as f:
+        return [b["userid"] for b in json.load(f)["bookings"]]
+
+
+def client_loop(args: Dict[str, Any]) -> int:
+    """Boucle d'un client : renvoie le nombre de requêtes réussies."""
+    rnd = random.Random(args["seed"])
+    conn = http.client.HTTPConnection("127.0.0.1", args["port"], timeout=10)
+    deadline = time.time() + args["duration"]
+    done = 0
+    while time.time() < deadline:
+        uid = rnd.choice(args["ids"])
+        if args["service"] == "user":
+            if rnd.random() < args["write_ratio"]:
+                conn.request("PUT", f"/users/{uid}", body="{}", headers={"Content-Type": "application/json"})
+            else:
+                conn.request("GET", f"/users/{uid}/admin")
+        else:
+            body = json.dumps({"query": "query($u: String!) { booking(userid: $u) { userid dates { date movies } } }",
+                               "variables": {"u": uid}})
+            conn.request("POST", "/graphql", body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        if resp.status < 500:
+            done += 1
+    conn.close()
+    return done
+
+
+def run_one(service: str, workers: int, clients: int, duration: float, write_ratio: float) -> Dict[str, Any]:
+    src = SERVICES[service]["dir"]
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp) / service
+        shutil.copytree(src, work, ignore=shutil.ignore_patterns("*.db*", "__pycache__"))
+        # modules communs, cherchés par le service dans ../common
+        shutil.copytree(ROOT / "common", Path(tmp) / "common", ignore=shutil.ignore_patterns("__pycache__"))
+        port = free_port()
+        env = dict(os.environ, STORAGE="sqlite", SQLITE_PATH=str(work / "data" / f"{service}.db"))
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}",
+             "--log-level", "warning", SERVICES[service]["app"]],
+            cwd=work, env=env,
+        )
+        try:
+            wait_for_port(port, proc=proc)
+            ids = load_ids(work, service)
+            jobs = [
+                {"port": port, "ids": ids, "duration": duration, "service": service,
+                 "write_ratio": write_ratio, "seed": i}
+                for i in range(clients)
+            ]
+            with ProcessPoolExecutor(max_workers=clients) as pool:
+                total = sum(pool.map(client_loop, jobs))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+    return {"service": service, "workers": workers, "clients": clients,
+            "requests": total, "rps": round(total / duration, 1)}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Benchmark throughput vs number of gunicorn workers (STORAGE=sqlite).")
+    p.add_argument("--service", choices=sorted(SERVICES), default="user")
+    p.add_argument("--workers", default="1,2,4,8", help="Comma separated worker counts")
+    p.add_argument("--clients", type=int, default=16, help="Concurrent client processes")
+    p.add_argument("--duration", type=float, default=10.0, help="Seconds per run")
+    p.add_argument("--write-ratio", type=float, default=0.1, help="Share of PUT /users/<id> (user service only)")
+    p.add_argument("--output", type=Path, help="Write results as JSON to this file")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    results = []
+    for w in [int(x) for x in args.workers.split(",") if x.strip()]:
+        res = run_one(args.service, w, args.clients, args.duration, args.write_ratio)
+        results.append(res)
+        print(f"[{res['service']}] workers={res['workers']:<3} clients={res['clients']:<3} {res['rps']:>9} req/s")
+    base = results[0]["rps"] or 1.0
+    for res in results:
+        print(f"  x{res['workers']}: speedup {res['rps'] / base:.2f}")
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "schedule"))
+
+import grpc  # noqa: E402
+import schedule_pb2  # noqa: E402
+import schedule_pb2_grpc  # noqa: E402
+from import_to_mongo import iter_json_array  # noqa: E402
+
+# Faux services movie (GraphQL), user (route admin) et schedule (gRPC), lancés dans le processus
+# courant, pour mesurer un service seul. On les branche via MOVIE_URL, USER_URL et SCHEDULE_ADDR.
+# Chaque faux service a un profil : latence, gigue, taux d'erreur, requêtes lentes.
+
+
+class Profile:
+    """Délai et erreurs d'un faux service ; mêmes paramètres + même graine = même suite de tirages."""
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, errors: float = 0.0,
+                 slow: float = 0.0, slow_ms: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.errors = errors
+        self.slow = slow
+        self.slow_ms = slow_ms
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, text: str, seed: int = 0) -> "Profile":
+        """"latency=20,jitter=5,errors=0.01,slow=0.001,slow_ms=2000" (tout est optionnel)."""
+        values: Dict[str, float] = {}
+        for part in (text or "").split(","):
+            if part.strip():
+                key, _, value = part.partition("=")
+                values[key.strip()] = float(value)
+        unknown = set(values) - {"latency", "jitter", "errors", "slow", "slow_ms"}
+        if unknown:
+            raise ValueError(f"unknown profile keys: {sorted(unknown)}")
+        return cls(values.get("latency", 0.0), values.get("jitter", 0.0), values.get("errors", 0.0),
+                   values.get("slow", 0.0), values.get("slow_ms", 0.0), seed)
+
+    def draw(self) -> tuple:
+        """(délai en secondes, échec ?) de la prochaine requête."""
+        with self._lock:
+            delay = max(0.0, self._rnd.gauss(self.latency_ms, self.jitter_ms)) if self.jitter_ms else self.latency_ms
+            if self.slow and self._rnd.random() < self.slow:
+                delay += self.slow_ms
+            failed = bool(self.errors) and self._rnd.random() < self.errors
+        return delay / 1000.0, failed
+
+    def apply(self) -> bool:
+        """Attend le délai tiré ; renvoie True si la requête doit échouer."""
+        delay, failed = self.draw()
+        if delay:
+            time.sleep(delay)
+        return failed
+
+
+# ---------- HTTP : movie (GraphQL) et user (admin) ----------
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: "FakeHTTPService"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: Any) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _handle(self, method: str) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"null") if length else None
+        with self.fake.lock:
+            self.fake.requests += 1
+        if self.fake.profile.apply():
+            self._reply(500, {"error": "injected failure"})
+            return
+        status, payload = self.fake.handle(method, self.path, body)
+        self._reply(status, payload)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class FakeHTTPService:
+    def __init__(self, profile: Profile, port: int = 0):
+        self.profile = profile
+        # compteur incrémenté par les threads du serveur (+= n'est pas atomique)
+        self.requests = 0
+        self.lock = threading.Lock()
+        handler = type("Handler", (_Handler,), {"fake": self})
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def start(self) -> "FakeHTTPService":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, method: str, path: str, body: Any) -> tuple:
+        raise NotImplementedError
+
+
+class FakeMovieService(FakeHTTPService):
+    """Répond aux requêtes `movie(id)` (booking) et `moviesByIds(ids)` (schedule) ; id inconnu -> null."""
+
+    def __init__(self, profile: Profile, movies: Dict[str, Dict], port: int = 0):
+        super().__init__(profile, port)
+        self.movies = movies
+
+    def movie(self, movie_id: str) -> Optional[Dict]:
+        return self.movies.get(movie_id)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/graphql"
+
+    def handle(self, method, path, body):
+        if method != "POST" or path.rstrip("/") != "/graphql" or not isinstance(body, dict):
+            return 404, {"error": "not found"}
+        query = body.get("query") or ""
+        variables = body.get("variables") or {}
+        if "moviesByIds" in query:
+            found = [self.movie(str(i)) for i in variables.get("ids", [])]
+            return 200, {"data": {"moviesByIds": [m for m in found if m is not None]}}
+        if re.search(r"\bmovie\s*\(", query):
+            return 200, {"data": {"movie": self.movie(str(variables.get("id")))}}
+        return 400, {"errors": [{"message": "operation not supported by the fake movie service"}]}
+
+
+class FakeUserService(FakeHTTPService):
+    """GET /users/<id>/admin."""
+
+    def __init__(self, profile: Profile, admins: set, port: int = 0):
+        super().__init__(profile, port)
+        self.admins = admins
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def handle(self, method, path, body):
+        m = re.fullmatch(r"/users/([^/]+)/admin", path)
+        if method != "GET" or not m:
+            return 404, {"error": "not found"}
+        userid = m.group(1)
+        return 200, {"userid": userid, "is_admin": userid in self.admins}
+
+
+# ---------- gRPC : schedule ----------
+
+class FakeScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
+    """GetScheduleByDate (le seul RPC appelé par booking) ; les autres restent UNIMPLEMENTED."""
+
+    def __init__(self, profile: Profile, schedule: Dict[str, List[str]]):
+        self.profile = profile
+        self.schedule = schedule
+        # compteur incrémenté par les threads du pool gRPC (+= n'est pas atomique)
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def _begin(self, context) -> None:
+        with self.lock:
+            self.requests += 1
+        if self.profile.apply():
+            context.abort(grpc.StatusCode.UNAVAILABLE, "injected failure")
+
+    def GetScheduleByDate(self, request, context):
+        self._begin(context)
+        if not re.fullmatch(r"\d{8}", request.date):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid date format. Use YYYYMMDD")
+        movies = self.schedule.get(request.date)
+        if movies is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Schedule not found for date: {request.date}")
+        return schedule_pb2.ScheduleEntry(date=request.date, movies=movies)
+
+
+class FakeScheduleService:
+    def __init__(self, servicer: FakeScheduleServicer, port: int = 0, workers: int = 32):
+        self.servicer = servicer
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+        schedule_pb2_grpc.add_ScheduleServicer_to_server(servicer, self.server)
+        self.port = self.server.add_insecure_port(f"127.0.0.1:{port}")
+
+    @property
+    def address(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def start(self) -> "FakeScheduleService":
+        self.server.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.stop(grace=None)
+
+
+# ---------- Données et démarrage ----------
+
+def load_fake_data(data_root: Path) -> Dict[str, Any]:
+    """Films, admins et planning d'un jeu de données (layout du dépôt)."""
+    movies = {m["id"]: {k: m.get(k) for k in ("id", "title", "director", "rating")}
+              for m in iter_json_array(data_root / "movie" / "data" / "movies.json", "movies")}
+    admins = {u["id"] for u in iter_json_array(data_root / "user" / "data" / "users.json", "users") if u.get("is_admin")}
+    schedule = {e["date"]: list(e.get("movies", []))
+                for e in iter_json_array(data_root / "schedule" / "data" / "times.json", "schedule")}
+    return {"movies": movies, "admins": admins, "schedule": schedule}
+
+
+class Fakes:
+    """Les trois faux services et les variables d'environnement qui les désignent."""
+
+    def __init__(self, movie: Profile, user: Profile, schedule: Profile,
+                 data_root: Path = ROOT, ports: Optional[Dict[str, int]] = None):
+        ports = ports or {}
+        data = load_fake_data(data_root)
+        self.movie = FakeMovieService(movie, data["movies"], ports.get("movie", 0))
+        self.user = FakeUserService(user, data["admins"], ports.get("user", 0))
+        self.schedule = FakeScheduleService(FakeScheduleServicer(schedule, data["schedule"]), ports.get("schedule", 0))
+
+    def start(self) -> "Fakes":
+        self.movie.start()
+        self.user.start()
+        self.schedule.start()
+        return self
+
+    def stop(self) -> None:
+        self.movie.stop()
+        self.user.stop()
+        self.schedule.stop()
+
+    def env(self) -> Dict[str, str]:
+        return {"MOVIE_URL": self.movie.url, "USER_URL": self.user.url, "SCHEDULE_ADDR": self.schedule.address}
+
+    def counts(self) -> Dict[str, int]:
+        return {"movie": self.movie.requests, "user": self.user.requests, "schedule": self.schedule.servicer.requests}
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Run fake movie, user and schedule services with latency/error profiles.")
+    p.add_argument("--profile", default="", help="Default profile for the three fakes, e.g. latency=20,jitter=5,errors=0.01")
+    p.add_argument("--movie", help="Profile of the fake movie service (overrides --profile)")
+    p.add_argument("--user", help="Profile of the fake user service")
+    p.add_argument("--schedule", help="Profile of the fake schedule service")
+    p.add_argument("--data-dir", type=Path, default=ROOT, help="Dataset to serve (repo layout, e.g. from generate_data.py)")
+    p.add_argument("--movie-port", type=int, default=0)
+    p.add_argument("--user-port", type=int, default=0)
+    p.add_argument("--schedule-port", type=int, default=0)
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    fakes = Fakes(
+        movie=Profile.parse(args.movie if args.movie is not None else args.profile, args.seed),
+        user=Profile.parse(args.user if args.user is not None else args.profile, args.seed + 1),
+        schedule=Profile.parse(args.schedule if args.schedule is not None else args.profile, args.seed + 2),
+        data_root=args.data_dir,
+        ports={"movie": args.movie_port, "user": args.user_port, "schedule": args.schedule_port},
+    ).start()
+    for key, value in fakes.env().items():
+        print(f"{key}={value}")
+    print("Fakes running, Ctrl+C to stop.", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fakes.stop()
+        print(f"requests served: {fakes.counts()}")
+
+
+if __name__ == "__main__":
+    main()
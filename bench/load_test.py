@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from bench_workers import free_port, port_in_use, wait_for_port
+from fakes import Fakes, Profile
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "schedule"))
+
+import grpc  # noqa: E402
+import schedule_pb2  # noqa: E402
+import schedule_pb2_grpc  # noqa: E402
+from import_to_mongo import DATA_SOURCES, import_mongo_source, iter_json_array  # noqa: E402
+
+# Test de charge des quatre services lancés en local (ports par défaut : ils s'appellent entre eux
+# sur localhost). Un mélange d'opérations GraphQL, REST et gRPC est rejoué à concurrence fixe
+# (--concurrency) ou à débit d'arrivée fixe (--rate) ; résultats par opération : p50/p95/p99, req/s.
+
+SERVICES = {
+    "movie": {"port": 3001, "script": "movie.py"},
+    "user": {"port": 3203, "script": "user.py"},
+    "schedule": {"port": 3202, "script": "schedule.py"},
+    "booking": {"port": 3201, "script": "booking.py"},
+}
+
+MOVIE_QUERY = "query($id: ID!) { movie(id: $id) { id title director rating } }"
+TOP_RATED_QUERY = "query { topRatedMovies(limit: 10) { id rating } }"
+BOOKING_QUERY = "query($u: String!) { booking(userid: $u) { userid dates { date movies } } }"
+STATS_QUERY = "query($d: String!) { statsMoviesForDate(date: $d) { date movies { count } } }"
+ADD_BOOKING = ("mutation($u: String!, $d: String!, $m: [String!]!, $k: String) "
+               "{ addBooking(userid: $u, date: $d, movies: $m, idempotencyKey: $k) { message } }")
+
+
+class Client:
+    """Connexions d'un thread client (HTTP keep-alive par service, canal gRPC partagé)."""
+
+    def __init__(self, data: Dict[str, Any], stub, rnd: random.Random):
+        self.data = data
+        self.stub = stub
+        self.rnd = rnd
+        self.conns: Dict[str, http.client.HTTPConnection] = {}
+
+    def http(self, service: str, method: str, path: str, body: Optional[dict] = None,
+             headers: Optional[dict] = None) -> bytes:
+        conn = self.conns.get(service)
+        if conn is None:
+            conn = self.conns[service] = http.client.HTTPConnection("127.0.0.1", SERVICES[service]["port"], timeout=30)
+        hdrs = {"Content-Type": "application/json"}
+        hdrs.update(headers or {})
+        try:
+            conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=hdrs)
+            resp = conn.getresponse()
+            payload = resp.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            del self.conns[service]
+            raise
+        # 404 : utilisateur inconnu, réponse normale ; 400 en GraphQL : le corps porte "errors"
+        if resp.status >= 400 and resp.status != 404 and not (resp.status == 400 and path == "/graphql"):
+            raise RuntimeError(f"HTTP {resp.status}")
+        return payload
+
+    def graphql(self, service: str, query: str, variables: dict, admin: bool = False) -> dict:
+        headers = {"X-User-Id": self.data["admin"]} if admin else None
+        result = json.loads(self.http(service, "POST", "/graphql", {"query": query, "variables": variables}, headers))
+        if result.get("errors"):
+            raise RuntimeError(result["errors"][0].get("message"))
+        return result
+
+    def pick(self, key: str):
+        return self.rnd.choice(self.data[key])
+
+    def close(self) -> None:
+        for conn in self.conns.values():
+            conn.close()
+
+
+def op_add_booking(c: Client) -> None:
+    date, movies = c.pick("shows")
+    c.graphql("booking", ADD_BOOKING, {"u": c.pick("users"), "d": date, "m": [c.rnd.choice(movies)],
+                                       "k": uuid.UUID(int=c.rnd.getrandbits(128)).hex})
+
+
+# nom -> opération ; le préfixe est le service visé
+OPERATIONS: Dict[str, Callable[[Client], Any]] = {
+    "movie.get": lambda c: c.graphql("movie", MOVIE_QUERY, {"id": c.pick("movies")}),
+    "movie.top_rated": lambda c: c.graphql("movie", TOP_RATED_QUERY, {}),
+    "user.get": lambda c: c.http("user", "GET", f"/users/{c.pick('users')}"),
+    "user.admin": lambda c: c.http("user", "GET", f"/users/{c.pick('users')}/admin"),
+    "user.touch": lambda c: c.http("user", "PUT", f"/users/{c.pick('users')}", {}),
+    "booking.get": lambda c: c.graphql("booking", BOOKING_QUERY, {"u": c.pick("booking_users")}),
+    "booking.stats": lambda c: c.graphql("booking", STATS_QUERY, {"d": c.pick("shows")[0]}, admin=True),
+    "booking.add": op_add_booking,
+    "schedule.get": lambda c: c.stub.GetScheduleByDate(schedule_pb2.DateRequest(date=c.pick("shows")[0]), timeout=30),
+    "schedule.best_rated": lambda c: c.stub.GetBestRatedMovie(schedule_pb2.DateRequest(date=c.pick("shows")[0]), timeout=30),
+    "schedule.top_rated": lambda c: c.stub.GetTopRatedForDate(schedule_pb2.TopRatedRequest(date=c.pick("shows")[0], k=5), timeout=30),
+}
+
+DEFAULT_MIX = ("movie.get=20,movie.top_rated=2,user.get=15,user.admin=10,user.touch=3,"
+               "booking.get=15,booking.stats=2,booking.add=3,schedule.get=15,schedule.best_rated=10,schedule.top_rated=5")
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"unknown operation '{name}' (known: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def load_data(data_root: Path, max_ids: int) -> Dict[str, Any]:
+    """Identifiants utilisés par les opérations, lus en flux (les fichiers peuvent être gros)."""
+    def ids(src_key: str, field: Optional[str]) -> List[Any]:
+        src = next(s for s in DATA_SOURCES if s["key"] == src_key)
+        out = []
+        for doc in iter_json_array(data_root / src["path"].relative_to(ROOT), src["key"]):
+            out.append(doc if field is None else doc[field])
+            if len(out) >= max_ids:
+                break
+        return out
+
+    users = []
+    admin = None
+    src = next(s for s in DATA_SOURCES if s["key"] == "users")
+    for doc in iter_json_array(data_root / src["path"].relative_to(ROOT), "users"):
+        if admin is None and doc.get("is_admin"):
+            admin = doc["id"]
+        if len(users) < max_ids:
+            users.append(doc["id"])
+        elif admin is not None:
+            break
+    shows = [(d["date"], d["movies"]) for d in ids("schedule", None) if d.get("movies")]
+    return {"movies": ids("movies", "id"), "users": users, "admin": admin,
+            "booking_users": ids("bookings", "userid") or users, "shows": shows}
+
+
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    # rang le plus proche sur des valeurs triées
+    k = max(0, min(len(values) - 1, math.ceil(p / 100.0 * len(values)) - 1))
+    return values[k]
+
+
+def client_process(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Un processus client : `threads` threads ; à débit fixe, les arrivées sont planifiées
+    à intervalles réguliers et la latence compte l'attente (pas d'omission coordonnée)."""
+    names = list(job["mix"])
+    weights = [job["mix"][n] for n in names]
+    channel = grpc.insecure_channel(f"127.0.0.1:{SERVICES['schedule']['port']}")
+    stub = schedule_pb2_grpc.ScheduleStub(channel)
+    samples: Dict[str, List[float]] = {n: [] for n in names}
+    errors: Dict[str, int] = {n: 0 for n in names}
+    # premier message d'erreur de chaque opération, pour le rapport
+    first_error: Dict[str, str] = {}
+    lock = threading.Lock()
+    start = time.perf_counter()
+    measure_from = start + job["warmup"]
+    deadline = measure_from + job["duration"]
+    interval = job["threads"] / job["rate"] if job["rate"] else 0.0
+
+    def worker(idx: int) -> None:
+        rnd = random.Random(job["seed"] * 1000 + idx)
+        client = Client(job["data"], stub, rnd)
+        # débit fixe : le thread idx traite les arrivées idx, idx + threads, ...
+        scheduled = start + (idx / job["threads"]) * interval
+        try:
+            while True:
+                if interval:
+                    now = time.perf_counter()
+                    if scheduled > now:
+                        time.sleep(scheduled - now)
+                    begin = scheduled
+                    scheduled += interval
+                else:
+                    begin = time.perf_counter()
+                if begin >= deadline:
+                    return
+                name = rnd.choices(names, weights)[0]
+                error = None
+                try:
+                    OPERATIONS[name](client)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                end = time.perf_counter()
+                if begin >= measure_from:
+                    with lock:
+                        if error is None:
+                            samples[name].append(end - begin)
+                        else:
+                            errors[name] += 1
+                            first_error.setdefault(name, error[:200])
+        finally:
+            client.close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(job["threads"])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    channel.close()
+    return {"samples": samples, "errors": errors, "first_error": first_error}
+
+
+def summarize(results: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    ops = {}
+    total = total_errors = 0
+    for name in results[0]["samples"]:
+        lat = sorted(x for r in results for x in r["samples"][name])
+        errs = sum(r["errors"][name] for r in results)
+        total += len(lat)
+        total_errors += errs
+        if not lat and not errs:
+            continue
+        ops[name] = {
+            "requests": len(lat), "errors": errs, "rps": round(len(lat) / duration, 1),
+            "p50_ms": round(percentile(lat, 50) * 1000, 2), "p95_ms": round(percentile(lat, 95) * 1000, 2),
+            "p99_ms": round(percentile(lat, 99) * 1000, 2), "max_ms": round(lat[-1] * 1000, 2) if lat else 0.0,
+        }
+        first_error = next((r["first_error"][name] for r in results if name in r["first_error"]), None)
+        if first_error:
+            ops[name]["first_error"] = first_error
+    return {"operations": ops, "total": {"requests": total, "errors": total_errors, "rps": round(total / duration, 1)}}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Stack:
+    """Copies des quatre services dans un dossier temporaire, lancées en sous-processus."""
+
+    def __init__(self, work: Path, data_dir: Optional[Path], env: Dict[str, str]):
+        self.work = work
+        self.env = env
+        self.procs: List[subprocess.Popen] = []
+        for name in SERVICES:
+            shutil.copytree(ROOT / name, work / name,
+                            ignore=shutil.ignore_patterns("*.db*", "*.journal", "__pycache__"))
+            if data_dir is not None and (data_dir / name / "data").is_dir():
+                shutil.copytree(data_dir / name / "data", work / name / "data", dirs_exist_ok=True)
+        # modules communs, cherchés par les services dans ../common
+        shutil.copytree(ROOT / "common", work / "common", ignore=shutil.ignore_patterns("__pycache__"))
+
+    def start(self, only: Optional[str] = None) -> None:
+        names = [only] if only else list(SERVICES)
+        # ports fixes (les services s'appellent entre eux) : un port déjà pris ferait mesurer un autre programme
+        busy = [f"{name} ({SERVICES[name]['port']})" for name in names if port_in_use(SERVICES[name]["port"])]
+        if busy:
+            raise SystemExit(f"port already in use: {', '.join(busy)}; stop what is listening or use --no-start")
+        for name in names:
+            svc = SERVICES[name]
+            log = (self.work / f"{name}.log").open("w")
+            self.procs.append(subprocess.Popen([sys.executable, "-u", svc["script"]], cwd=self.work / name,
+                                               env=self.env, stdout=log, stderr=subprocess.STDOUT))
+        for name, proc in zip(names, self.procs[-len(names):]):
+            try:
+                wait_for_port(SERVICES[name]["port"], timeout=120, proc=proc)
+            except RuntimeError:
+                print((self.work / f"{name}.log").read_text()[-2000:], file=sys.stderr)
+                raise
+
+    def stop(self) -> None:
+        for proc in self.procs:
+            proc.terminate()
+        for proc in self.procs:
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def start_mongod(stack: ExitStack, tmp: Path, binary: str) -> str:
+    """mongod jetable (dossier temporaire, port libre) en guise de Mongo local."""
+    port = free_port()
+    (tmp / "mongo").mkdir()
+    proc = subprocess.Popen([binary, "--dbpath", str(tmp / "mongo"), "--port", str(port), "--bind_ip", "127.0.0.1"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    stack.callback(lambda: (proc.terminate(), proc.wait(timeout=10)))
+    wait_for_port(port, timeout=30, proc=proc)
+    return f"mongodb://127.0.0.1:{port}"
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="End-to-end load test of movie, user, booking and schedule.")
+    p.add_argument("--mix", default=DEFAULT_MIX, help="name=weight,... (operations: %s)" % ", ".join(OPERATIONS))
+    p.add_argument("--concurrency", type=int, default=16, help="Client threads in total")
+    p.add_argument("--rate", type=float, default=0.0, help="Fixed arrival rate in req/s (0 = closed loop at --concurrency)")
+    p.add_argument("--processes", type=int, default=max(1, min(4, os.cpu_count() or 1)), help="Client processes")
+    p.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    p.add_argument("--warmup", type=float, default=3.0, help="Seconds before measuring")
+    p.add_argument("--data-dir", type=Path, help="Dataset from bench/generate_data.py (<dir>/<service>/data/*.json)")
+    p.add_argument("--mongo-url", help="Run the services with STORAGE=mongo against this server (the dataset is imported first)")
+    p.add_argument("--mongod", metavar="BINARY", help="Start a throwaway local mongod (e.g. 'mongod') and use it")
+    p.add_argument("--max-ids", type=int, default=100000, help="Ids sampled from each data file")
+    p.add_argument("--isolate", choices=sorted(SERVICES),
+                   help="Start only this service; its dependencies are in-process fakes (see bench/fakes.py)")
+    p.add_argument("--fake-profile", default="", help="Profile of the fakes, e.g. latency=20,jitter=5,errors=0.01")
+    p.add_argument("--fake-movie", help="Profile of the fake movie service (overrides --fake-profile)")
+    p.add_argument("--fake-user", help="Profile of the fake user service")
+    p.add_argument("--fake-schedule", help="Profile of the fake schedule service")
+    p.add_argument("--no-start", action="store_true", help="Services are already running on the default ports")
+    p.add_argument("--seed", type=int, default=1)
+    p.add_argument("--output", type=Path, help="Write config and results as JSON to this file")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    if args.isolate:
+        mix = {name: w for name, w in mix.items() if name.startswith(args.isolate + ".")}
+        if not mix:
+            raise SystemExit(f"no operation of '{args.isolate}' in the mix")
+    fakes = None
+    with ExitStack() as stack:
+        tmp = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+        env = dict(os.environ, STORAGE="json", LAST_ACTIVE_FLUSH=os.environ.get("LAST_ACTIVE_FLUSH", "5"))
+        mongo_url = args.mongo_url or (start_mongod(stack, tmp, args.mongod) if args.mongod else None)
+        if args.no_start:
+            data_root = args.data_dir or ROOT
+        else:
+            services = Stack(tmp, args.data_dir, env)
+            data_root = tmp
+            if mongo_url:
+                from pymongo import MongoClient
+                db_name = f"loadtest_{os.getpid()}"
+                db = MongoClient(mongo_url)[db_name]
+                for src in DATA_SOURCES:
+                    import_mongo_source(db, dict(src, path=tmp / src["path"].relative_to(ROOT)), True, 1000)
+                stack.callback(lambda: db.client.drop_database(db_name))
+                env.update(STORAGE="mongo", USE_MONGO="true", MONGO_URL=mongo_url, MONGO_DB_NAME=db_name)
+            if args.isolate:
+                # mêmes données que le service mesuré ; profils reproductibles (graine fixe)
+                fakes = Fakes(
+                    movie=Profile.parse(args.fake_movie if args.fake_movie is not None else args.fake_profile, args.seed),
+                    user=Profile.parse(args.fake_user if args.fake_user is not None else args.fake_profile, args.seed + 1),
+                    schedule=Profile.parse(args.fake_schedule if args.fake_schedule is not None else args.fake_profile, args.seed + 2),
+                    data_root=tmp,
+                ).start()
+                stack.callback(fakes.stop)
+                env.update(fakes.env())
+            services.start(args.isolate)
+            stack.callback(services.stop)
+        data = load_data(data_root, args.max_ids)
+        if data["admin"] is None and any(n in mix for n in ("booking.stats",)):
+            raise SystemExit("no admin user in the dataset (needed by booking.stats)")
+
+        procs = max(1, min(args.processes, args.concurrency))
+        jobs = [{"mix": mix, "data": data, "seed": args.seed + i, "warmup": args.warmup, "duration": args.duration,
+                 "threads": args.concurrency // procs + (1 if i < args.concurrency % procs else 0),
+                 "rate": args.rate / procs if args.rate else 0.0}
+                for i in range(procs)]
+        mode = f"rate={args.rate}/s" if args.rate else f"concurrency={args.concurrency}"
+        print(f"Load test: {mode}, {procs} process(es), {args.warmup}s warmup + {args.duration}s", flush=True)
+        # spawn : pas de fork d'un processus qui a déjà des threads gRPC (faux schedule)
+        with ProcessPoolExecutor(max_workers=procs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(client_process, jobs))
+
+    report = summarize(results, args.duration)
+    if fakes is not None:
+        report["fake_requests"] = fakes.counts()
+    print(f"{'operation':<22}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for name, r in report["operations"].items():
+        print(f"{name:<22}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['errors']:>8}")
+    print(f"{'total':<22}{report['total']['rps']:>9}{'':>27}{report['total']['errors']:>8}")
+    for name, r in report["operations"].items():
+        if "first_error" in r:
+            print(f"  {name}: {r['first_error']}")
+    if args.output:
+        config = {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()}
+        config["mix"] = mix
+        meta = {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "commit": git_commit(),
+                "python": platform.python_version(), "cpus": os.cpu_count(), "storage": "mongo" if mongo_url else "json"}
+        args.output.write_text(json.dumps({"meta": meta, "config": config, **report}, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
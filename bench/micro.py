@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from generate_data import Dataset, write_json_array
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).resolve().parent / "micro_baseline.json"
+
+# Micro-benchmarks des fonctions chaudes, service par service, à plusieurs tailles de données.
+# Chaque (service, taille) tourne dans un processus à part, lancé dans une copie du service :
+# les modules chargent leurs données à l'import, comme en production. Les appels réseau
+# (service movie, vérification admin) sont remplacés par des fonctions locales.
+
+
+def time_call(fn: Callable[[], Any], min_time: float, repeats: int) -> float:
+    """Secondes par appel : meilleure de `repeats` mesures d'au moins `min_time` secondes chacune
+    (le minimum est le moins sensible aux autres processus de la machine)."""
+    fn()
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time / 10 or number >= 1 << 20:
+            break
+        number *= 4
+    number = max(1, int(number * (min_time / max(elapsed, 1e-9))))
+    runs = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        runs.append((time.perf_counter() - t0) / number)
+    return min(runs)
+
+
+class FakeContext:
+    def abort(self, code, details):
+        raise RuntimeError(f"{code}: {details}")
+
+
+# ---------- Cas par service (exécutés dans le processus enfant, cwd = copie du service) ----------
+
+def cases_movie(rnd: random.Random) -> Dict[str, Callable[[], Any]]:
+    import resolvers as r
+    movies = r.load_movies()
+    actors = r.load_actors()
+    return {
+        "filter_movies": lambda: r.filter_movies(title=rnd.choice(movies)["title"]),
+        "get_actors_for_movie": lambda: r.get_actors_for_movie(rnd.choice(movies)["id"]),
+        "resolve_top_rated_movies": lambda: r.resolve_top_rated_movies(None, None, 10),
+        "save_movies": lambda: r.save_movies(r.load_movies()),
+        "save_actors": lambda: r.save_actors(r.load_actors()),
+        "save_actor": lambda: r.save_actor(dict(rnd.choice(actors))),
+    }
+
+
+def cases_booking(rnd: random.Random) -> Dict[str, Callable[[], Any]]:
+    import resolvers as r
+    with open("../movie/data/movies.json", encoding="utf-8") as f:
+        movies = {m["id"]: m for m in json.load(f)["movies"]}
+    with open("../schedule/data/times.json", encoding="utf-8") as f:
+        dates = [d["date"] for d in json.load(f)["schedule"]]
+    # pas de service user ni movie : vérification admin et fiche film locales
+    r.require_admin = lambda info: None
+    r.get_movie = lambda movie_id: movies.get(movie_id)
+    userids = [b["userid"] for b in r.all_bookings()] or ["nobody"]
+    return {
+        "find_user_booking": lambda: r.find_user_booking(rnd.choice(userids)),
+        "resolve_stats_movies_for_date": lambda: r.resolve_stats_movies_for_date(None, None, rnd.choice(dates)),
+        "write": r.write,
+    }
+
+
+def cases_user(rnd: random.Random) -> Dict[str, Callable[[], Any]]:
+    import user as u
+    users = u.all_users()
+    ids = [x["id"] for x in users]
+    return {
+        "find_user": lambda: u.find_user(rnd.choice(ids)),
+        "write": lambda: (lambda uid: u.write({uid: u.find_user(uid)}))(rnd.choice(ids)),
+        "save_last_active": lambda: u.save_last_active({rnd.choice(ids): int(time.time() * 1000)}),
+    }
+
+
+def cases_schedule(rnd: random.Random) -> Dict[str, Callable[[], Any]]:
+    import schedule as s
+    with open("../movie/data/movies.json", encoding="utf-8") as f:
+        movies = {m["id"]: {"title": m["title"], "director": m["director"], "rating": m["rating"]}
+                  for m in json.load(f)["movies"]}
+    # client movie remplacé : les fiches viennent du fichier
+    s.get_movies_info = lambda ids: {i: movies[i] for i in ids if i in movies}
+    servicer = s.ScheduleServicer()
+    servicer._refresher.shutdown(wait=False)
+    ctx = FakeContext()
+    dates = list(servicer.schedule)
+
+    def best_rated_cold():
+        # classement et catalogue vidés : relecture des films puis tri
+        date = rnd.choice(dates)
+        servicer._ranked.pop(date, None)
+        for movie_id in servicer.schedule[date].get("movies", []):
+            servicer._catalog.pop(movie_id, None)
+        servicer.GetBestRatedMovie(s.schedule_pb2.DateRequest(date=date), ctx)
+
+    return {
+        "GetBestRatedMovie": lambda: servicer.GetBestRatedMovie(s.schedule_pb2.DateRequest(date=rnd.choice(dates)), ctx),
+        "GetBestRatedMovie_cold": best_rated_cold,
+        "save_schedule": lambda: s.save_schedule(s.load_schedule()),
+        "save_schedule_date": lambda: s.save_schedule_date(*(lambda d: (d, servicer.schedule[d]))(rnd.choice(dates))),
+    }
+
+
+CASES = {"movie": cases_movie, "booking": cases_booking, "user": cases_user, "schedule": cases_schedule}
+
+
+def child(service: str, min_time: float, repeats: int, only: Optional[List[str]]) -> None:
+    sys.path.insert(0, os.getcwd())
+    # modules communs (datawatch, ...) : copiés à côté des services par prepare()
+    sys.path.append(os.path.join(os.path.dirname(os.getcwd()), "common"))
+    cases = CASES[service](random.Random(0))
+    results = {}
+    for name, fn in cases.items():
+        key = f"{service}.{name}"
+        if only and not any(key.startswith(o) for o in only):
+            continue
+        results[key] = time_call(fn, min_time, repeats)
+    print("RESULTS " + json.dumps(results))
+
+
+# ---------- Orchestration ----------
+
+def prepare(work: Path, bookings: int, seed: int) -> None:
+    """Copie des services + jeu de données généré de la taille demandée."""
+    for service in CASES:
+        shutil.copytree(ROOT / service, work / service,
+                        ignore=shutil.ignore_patterns("*.db*", "*.journal", "__pycache__"))
+    shutil.copytree(ROOT / "common", work / "common", ignore=shutil.ignore_patterns("__pycache__"))
+    movies = max(50, bookings // 100)
+    dataset = Dataset(bookings=bookings, movies=movies, actors=2 * movies, users=max(20, bookings // 20),
+                      days=365, shows_per_day=12, start=datetime.date(2015, 11, 30), skew=1.1, seed=seed)
+    for src, generate in dataset.sources():
+        write_json_array(work / src["path"].relative_to(ROOT), src["key"], generate())
+
+
+def run_size(bookings: int, args: argparse.Namespace) -> Dict[str, float]:
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        prepare(work, bookings, args.seed)
+        env = dict(os.environ, STORAGE=args.storage, DATA_WATCH_INTERVAL="0", LAST_ACTIVE_FLUSH="0",
+                   USE_MONGO="false", SCHEDULE_ADDR="", WRITE_BEHIND_MS="0")
+        for service in CASES:
+            if args.only and not any(o.split(".")[0] == service for o in args.only):
+                continue
+            cmd = [sys.executable, str(Path(__file__).resolve()), "--child", service,
+                   "--min-time", str(args.min_time), "--repeats", str(args.repeats)]
+            if args.only:
+                cmd += ["--only", ",".join(args.only)]
+            proc = subprocess.run(cmd, cwd=work / service, env=env, capture_output=True, text=True)
+            line = next((x for x in reversed(proc.stdout.splitlines()) if x.startswith("RESULTS ")), None)
+            if proc.returncode != 0 or line is None:
+                raise RuntimeError(f"{service} benchmarks failed:\n{proc.stderr[-3000:]}")
+            results.update(json.loads(line[len("RESULTS "):]))
+    return results
+
+
+def fit_exponent(points: Dict[int, float]) -> Optional[float]:
+    """Pente de log(temps) en fonction de log(taille) : ~0 constant, ~1 linéaire, ~2 quadratique."""
+    xs = [math.log(n) for n, t in points.items() if t > 0]
+    ys = [math.log(t) for n, t in points.items() if t > 0]
+    if len(xs) < 2:
+        return None
+    mx, my = sum(xs) / len(xs), sum(ys) / len(ys)
+    var = sum((x - mx) ** 2 for x in xs)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / var if var else None
+
+
+def complexity(exponent: Optional[float]) -> str:
+    if exponent is None:
+        return "?"
+    if exponent < 0.25:
+        return "O(1)"
+    if exponent < 0.75:
+        return "sublinear"
+    if exponent < 1.3:
+        return "O(n)"
+    if exponent < 1.7:
+        return "O(n log n)+"
+    return "O(n^2)+"
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float, max_exp_increase: float) -> Dict[str, List[str]]:
+    """Régressions par fonction : plus lente de plus de `threshold` à une taille, ou courbe plus raide."""
+    failures: Dict[str, List[str]] = {}
+    for name, cur in report["functions"].items():
+        base = baseline.get("functions", {}).get(name)
+        if base is None:
+            continue
+        for size, t in cur["seconds"].items():
+            b = base["seconds"].get(size)
+            if b and t > b * (1 + threshold):
+                failures.setdefault(name, []).append(
+                    f"{name} @ {size}: {t * 1e6:.1f}us vs {b * 1e6:.1f}us baseline (+{(t / b - 1) * 100:.0f}%)")
+        if cur["exponent"] is not None and base.get("exponent") is not None \
+                and cur["exponent"] > base["exponent"] + max_exp_increase:
+            failures.setdefault(name, []).append(
+                f"{name}: complexity n^{cur['exponent']:.2f} vs n^{base['exponent']:.2f} baseline")
+    return failures
+
+
+def make_report(by_size: Dict[int, Dict[str, float]], args: argparse.Namespace) -> Dict[str, Any]:
+    functions = {}
+    for name in sorted({k for r in by_size.values() for k in r}):
+        points = {n: r[name] for n, r in by_size.items() if name in r}
+        exponent = fit_exponent(points)
+        functions[name] = {"seconds": {str(n): t for n, t in points.items()},
+                           "exponent": round(exponent, 3) if exponent is not None else None,
+                           "complexity": complexity(exponent)}
+    return {
+        "meta": {"timestamp": datetime.datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(),
+                 "machine": platform.machine(), "storage": args.storage, "sizes": list(by_size), "seed": args.seed},
+        "functions": functions,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Micro-benchmarks of resolver and storage hot paths.")
+    p.add_argument("--sizes", default="10000,30000,100000", help="Dataset sizes, in bookings (see generate_data.py)")
+    p.add_argument("--storage", choices=["json", "sqlite"], default="json")
+    p.add_argument("--only", type=lambda s: [x for x in s.split(",") if x], help="Benchmark name prefixes, e.g. movie.,user.find_user")
+    p.add_argument("--min-time", type=float, default=0.2, help="Seconds per measurement")
+    p.add_argument("--repeats", type=int, default=5)
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--baseline", type=Path, default=BASELINE)
+    p.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    p.add_argument("--threshold", type=float, default=1.0, help="Fail when a function is this much slower (1.0 = twice as slow)")
+    p.add_argument("--max-exponent-increase", type=float, default=0.3, help="Fail when the fitted exponent grows by more")
+    p.add_argument("--output", type=Path, help="Also write this run as JSON here")
+    p.add_argument("--child", help=argparse.SUPPRESS)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        child(args.child, args.min_time, args.repeats, args.only)
+        return
+
+    sizes = [int(x) for x in args.sizes.split(",") if x.strip()]
+    by_size = {}
+    for n in sizes:
+        t0 = time.monotonic()
+        by_size[n] = run_size(n, args)
+        print(f"size {n}: {len(by_size[n])} functions in {time.monotonic() - t0:.1f}s", flush=True)
+
+    report = make_report(by_size, args)
+    baseline = None
+    if not args.save_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("meta", {}).get("storage") != args.storage:
+            print(f"Baseline is for storage={baseline.get('meta', {}).get('storage')}, not compared.")
+            baseline = None
+    failures = compare(report, baseline, args.threshold, args.max_exponent_increase) if baseline else {}
+    if failures:
+        # une mesure isolée peut tomber sur une machine chargée : on remesure avant de conclure
+        print(f"Re-measuring {len(failures)} function(s) slower than the baseline...", flush=True)
+        args.only = sorted(failures)
+        for n in sizes:
+            for name, t in run_size(n, args).items():
+                if name in failures:
+                    by_size[n][name] = min(by_size[n][name], t)
+        report = make_report(by_size, args)
+        failures = compare(report, baseline, args.threshold, args.max_exponent_increase)
+
+    header = "".join(f"{n:>12}" for n in sizes)
+    print(f"{'function':<42}{header}   exponent")
+    for name, f in report["functions"].items():
+        cells = "".join(f"{f['seconds'].get(str(n), 0) * 1e6:>10.1f}us" for n in sizes)
+        exp = f"{f['exponent']:.2f}" if f["exponent"] is not None else "-"
+        print(f"{name:<42}{cells}   {exp:>5} {f['complexity']}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Baseline saved to {args.baseline}")
+    elif failures:
+        print("Regressions against the baseline:")
+        for messages in failures.values():
+            for message in messages:
+                print("  " + message)
+        sys.exit(1)
+    elif baseline:
+        print("No regression against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,20 @@
+import os
+import sys
+
 from ariadne import graphql_sync
 from flask import Flask, request, jsonify, make_response
 
+# modules communs aux services (datawatch, ...) : dossier common/ du dépôt, copié dans /app par le Dockerfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+
 import resolvers as r
+from metrics import install_flask
 
 PORT = 3201
 HOST = "0.0.0.0"
 
 app = Flask(__name__)
+install_flask(app, r.schema)
 schema = r.schema
 
 
@@ -1,6 +1,11 @@
 import json
 import re
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Dict
 
@@ -9,6 +14,8 @@ import grpc
 
 import schedule_pb2
 import schedule_pb2_grpc
+from datawatch import watcher, write_json_atomic
+from metrics import DOWNSTREAM_DURATION, STORAGE_DURATION, cache_lookup, timed
 
 from ariadne import (
     QueryType,
@@ -19,7 +26,13 @@ from ariadne import (
 from graphql import GraphQLError
 
 BOOKINGS_PATH = "./data/bookings.json"
-USE_MONGO = os.environ.get("USE_MONGO", "false").lower() == "true"
+# STORAGE = json | mongo | sqlite (USE_MONGO=true reste équivalent à STORAGE=mongo)
+STORAGE = os.environ.get("STORAGE", "").lower() or (
+    "mongo" if os.environ.get("USE_MONGO", "false").lower() == "true" else "json"
+)
+USE_MONGO = STORAGE == "mongo"
+USE_SQLITE = STORAGE == "sqlite"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "./data/booking.db")
 MONGO_URL = os.environ.get("MONGO_URL", "")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "appdb")
 _mongo_db = None
@@ -31,10 +44,85 @@ if USE_MONGO:
         _mongo_db = None
 DATE_RX = re.compile(r"^\d{8}$")
 
+# Clés d'idempotence : durée de vie (s) et nombre max de résultats gardés en mémoire
+IDEMPOTENCY_TTL = float(os.environ.get("IDEMPOTENCY_TTL", "600"))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+# SCHEDULE_WATCH=true : copie locale du planning tenue à jour par WatchSchedule
+SCHEDULE_WATCH = os.environ.get("SCHEDULE_WATCH", "false").lower() == "true"
+
+
+# ---------- SQLite (état partagé entre plusieurs workers) ----------
+
+# schéma partagé avec import_to_mongo.py --backend sqlite
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql"), encoding="utf-8") as _schema:
+    SQLITE_SCHEMA = _schema.read()
+
+_sqlite_local = threading.local()
+
+
+def sqlite_conn():
+    # une connexion par thread ; en WAL les lecteurs ne bloquent pas l'écrivain
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _sqlite_local.conn = conn
+    return conn
+
+
+@contextmanager
+def sqlite_transaction():
+    # BEGIN IMMEDIATE : prend le verrou d'écriture tout de suite (pas de lecture périmée)
+    conn = sqlite_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def init_sqlite():
+    sqlite_conn().executescript(SQLITE_SCHEMA)
+    # premier démarrage : on importe le JSON (une seule fois, même avec N workers)
+    with sqlite_transaction() as conn:
+        empty = conn.execute("SELECT 1 FROM bookings LIMIT 1").fetchone() is None
+        if empty and os.path.exists(BOOKINGS_PATH):
+            with open(BOOKINGS_PATH, "r", encoding="utf-8") as jsf:
+                seed = json.load(jsf)["bookings"]
+            conn.executemany(
+                "INSERT OR IGNORE INTO bookings (userid, date, movie) VALUES (?, ?, ?)",
+                [
+                    (b["userid"], d["date"], m)
+                    for b in seed
+                    for d in b.get("dates", [])
+                    for m in d.get("movies", [])
+                ],
+            )
+
 
-if USE_MONGO and _mongo_db is not None:
+def _rows_to_bookings(rows) -> List[Dict]:
+    # (userid, date, movie) triés par rowid -> format JSON habituel
+    by_user: Dict[str, Dict] = {}
+    for userid, date, movie in rows:
+        entry = by_user.setdefault(userid, {"userid": userid, "dates": []})
+        dentry = find_date_entry(entry, date)
+        if dentry is None:
+            dentry = {"date": date, "movies": []}
+            entry["dates"].append(dentry)
+        dentry["movies"].append(movie)
+    return list(by_user.values())
+
+
+if USE_SQLITE:
+    os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
+    init_sqlite()
+    bookings: List[Dict] = []
+elif USE_MONGO and _mongo_db is not None:
     try:
-        bookings: List[Dict] = list(_mongo_db.bookings.find({}, {"_id": 0}))
+        bookings = list(_mongo_db.bookings.find({}, {"_id": 0}))
     except Exception:
         bookings = []
 else:
@@ -42,6 +130,22 @@ else:
         bookings = json.load(jsf)["bookings"]
 
 
+# json / mongo : une modification (changement + écriture) à la fois, jamais pendant un rechargement
+_bookings_lock = threading.RLock()
+
+
+def reload_bookings(loaded: List[Dict]):
+    # bookings.json modifié hors du service : la nouvelle liste remplace l'ancienne d'un coup
+    # (appelé par datawatch sous _bookings_lock)
+    global bookings
+    bookings = loaded
+
+
+if STORAGE == "json":
+    watcher.watch(BOOKINGS_PATH, "bookings", reload_bookings, _bookings_lock)
+
+
+@timed(STORAGE_DURATION, "write")
 def write():
     if USE_MONGO and _mongo_db is not None:
         try:
@@ -51,8 +155,8 @@ def write():
             return
         except Exception:
             pass
-    with open(BOOKINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump({"bookings": bookings}, f, ensure_ascii=False, indent=2)
+    write_json_atomic(BOOKINGS_PATH, {"bookings": bookings})
+    watcher.written(BOOKINGS_PATH)
 
 
 def validate_date_str(date_str: str) -> bool:
@@ -72,7 +176,8 @@ def require_admin(info):
         raise GraphQLError("missing X-User-Id header")
     base = os.environ.get("USER_URL", "http://localhost:3203")
     try:
-        resp = requests.get(f"{base}/users/{user_id}/admin", timeout=3)
+        with DOWNSTREAM_DURATION.time("require_admin"):
+            resp = requests.get(f"{base}/users/{user_id}/admin", timeout=3)
     except requests.RequestException:
         raise GraphQLError("user service unreachable")
     if resp.status_code != 200:
@@ -95,12 +200,13 @@ def get_movie(movie_id: str):
     }
     """
     try:
-        r = requests.post(
-            #MOVIE_URL permet de connaitre la localisation du conteneur
-            os.environ.get("MOVIE_URL", "http://localhost:3001/graphql"),
-            json={"query": query, "variables": {"id": movie_id}},
-            timeout=3,
-        )
+        with DOWNSTREAM_DURATION.time("get_movie"):
+            r = requests.post(
+                #MOVIE_URL permet de connaitre la localisation du conteneur
+                os.environ.get("MOVIE_URL", "http://localhost:3001/graphql"),
+                json={"query": query, "variables": {"id": movie_id}},
+                timeout=3,
+            )
     except requests.RequestException:
         return None
 
@@ -112,12 +218,93 @@ def get_movie(movie_id: str):
     return payload.get("data", {}).get("movie")
 
 
+# ********** copie locale du planning (WatchSchedule) **********
+
+class ScheduleMirror:
+    """Planning en mémoire, alimenté par le flux WatchSchedule du service schedule.
+
+    Tant que la copie n'est pas synchronisée (démarrage, connexion perdue),
+    check_schedule interroge le service comme avant.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.entries: Dict[str, List[str]] = {}
+        self.version = 0
+        self.synced = False
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        threading.Thread(target=self.run, name="schedule-watch", daemon=True).start()
+        return self
+
+    def run(self):
+        delay = 0.5
+        while True:
+            self._snapshot = None
+            try:
+                with grpc.insecure_channel(self.address) as channel:
+                    stub = schedule_pb2_grpc.ScheduleStub(channel)
+                    for change in stub.WatchSchedule(schedule_pb2.WatchRequest(from_version=self.version)):
+                        self.apply(change)
+                        delay = 0.5
+            except grpc.RpcError:
+                pass
+            # flux coupé : on ne se fie plus à la copie jusqu'à la reprise
+            self.synced = False
+            time.sleep(delay)
+            delay = min(delay * 2, 10)
+
+    def apply(self, change):
+        kind = change.type
+        if kind == schedule_pb2.ScheduleChange.SNAPSHOT:
+            if self._snapshot is None:
+                self._snapshot = {}
+            self._snapshot[change.entry.date] = list(change.entry.movies)
+            return
+        with self._lock:
+            if kind == schedule_pb2.ScheduleChange.SNAPSHOT_END:
+                self.entries = self._snapshot or {}
+                self._snapshot = None
+            elif kind == schedule_pb2.ScheduleChange.DELETED:
+                self.entries.pop(change.entry.date, None)
+            else:
+                self.entries[change.entry.date] = list(change.entry.movies)
+            self.version = change.version
+            self.synced = True
+
+    def movies_for(self, date_str):
+        """Films de la date, None si la date n'est pas au planning."""
+        with self._lock:
+            movies = self.entries.get(date_str)
+        return None if movies is None else list(movies)
+
+
+_schedule_mirror = ScheduleMirror(os.environ.get("SCHEDULE_ADDR", "localhost:3202")).start() if SCHEDULE_WATCH else None
+
+
 # **********  version gRPC de check_schedule **********
 
 def check_schedule(date_str, movie_ids):
+    use_mirror = _schedule_mirror is not None and _schedule_mirror.synced and DATE_RX.match(date_str or "")
+    if _schedule_mirror is not None:
+        cache_lookup("schedule_mirror", bool(use_mirror))
+    if use_mirror:
+        allowed_movies = _schedule_mirror.movies_for(date_str)
+        if allowed_movies is None:
+            raise GraphQLError("date not found in schedule")
+        not_allowed = [m for m in movie_ids if m not in allowed_movies]
+        if not_allowed:
+            raise GraphQLError(
+                f"some movies are not scheduled for this date: {not_allowed}"
+            )
+        return
+
     try:
         #connexion service schedule
-        with grpc.insecure_channel(os.environ.get("SCHEDULE_ADDR", "localhost:3202")) as channel:
+        with DOWNSTREAM_DURATION.time("check_schedule"), \
+                grpc.insecure_channel(os.environ.get("SCHEDULE_ADDR", "localhost:3202")) as channel:
             stub = schedule_pb2_grpc.ScheduleStub(channel)
             #requete au service schedule
             resp = stub.GetScheduleByDate(
@@ -140,7 +327,169 @@ def check_schedule(date_str, movie_ids):
         )
 
 
+# ********** Idempotence de addBooking / deleteBooking **********
+
+class _IdempotencyEntry:
+    def __init__(self, fingerprint, expires_at):
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+        self.done = threading.Event()
+        self.result = None
+
+
+# clé -> _IdempotencyEntry, dans l'ordre d'insertion (donc d'expiration)
+_idempotency_entries: "OrderedDict[tuple, _IdempotencyEntry]" = OrderedDict()
+_idempotency_lock = threading.Lock()
+
+
+def get_idempotency_key(info, key=None):
+    # l'argument GraphQL est prioritaire sur le header HTTP
+    if key:
+        return key
+    request = info.context["request"]
+    return request.headers.get("Idempotency-Key") or None
+
+
+def _evict_idempotency_entries(now):
+    # entrées expirées en tête, puis on borne la taille de la table
+    while _idempotency_entries:
+        oldest_key, oldest = next(iter(_idempotency_entries.items()))
+        if oldest.expires_at > now and len(_idempotency_entries) <= IDEMPOTENCY_MAX_KEYS:
+            break
+        del _idempotency_entries[oldest_key]
+
+
+class _SharedReplay(Exception):
+    """Clé déjà utilisée par un autre worker : on renvoie son résultat au lieu d'écrire."""
+
+    def __init__(self, result):
+        super().__init__("idempotent replay")
+        self.result = result
+
+
+def run_idempotent(operation, key, fingerprint, fn):
+    """Exécute fn(idem) une seule fois par clé et renvoie le résultat d'origine aux retries.
+
+    idem = (operation, key, fingerprint) en SQLite, None sinon : l'écriture le passe à
+    booking_transaction pour réserver la clé dans sa propre transaction.
+    """
+    if not key:
+        return fn(None)
+
+    cache_key = (operation, key)
+    while True:
+        with _idempotency_lock:
+            now = time.monotonic()
+            _evict_idempotency_entries(now)
+            entry = _idempotency_entries.get(cache_key)
+            if entry is None:
+                entry = _IdempotencyEntry(fingerprint, now + IDEMPOTENCY_TTL)
+                _idempotency_entries[cache_key] = entry
+                break
+        if entry.fingerprint != fingerprint:
+            raise GraphQLError("idempotency key already used with different arguments")
+        # une première tentative est peut-être encore en cours : on attend son résultat
+        entry.done.wait()
+        if entry.result is not None:
+            cache_lookup("idempotency", True)
+            return dict(entry.result)
+        # la première tentative a échoué, elle n'a rien écrit : on réessaie
+
+    try:
+        entry.result = _load_shared_result(operation, key, fingerprint)
+        cache_lookup("idempotency", entry.result is not None)
+        if entry.result is None:
+            try:
+                entry.result = fn((operation, key, fingerprint) if USE_SQLITE else None)
+            except _SharedReplay as replay:
+                # un autre worker a traité la même clé entre la lecture ci-dessus et l'écriture
+                entry.result = replay.result
+    finally:
+        if entry.result is None:
+            # les erreurs ne sont pas mémorisées, un retry refait la validation
+            with _idempotency_lock:
+                if _idempotency_entries.get(cache_key) is entry:
+                    del _idempotency_entries[cache_key]
+        entry.done.set()
+    return dict(entry.result)
+
+
+def _load_shared_result(operation, key, fingerprint):
+    # en SQLite la table est partagée : un retry arrivé sur un autre worker la retrouve
+    if not USE_SQLITE:
+        return None
+    row = sqlite_conn().execute(
+        "SELECT fingerprint, result FROM idempotency"
+        " WHERE operation = ? AND key = ? AND expires_at > ?",
+        (operation, key, time.time()),
+    ).fetchone()
+    if row is None:
+        return None
+    if row[0] != json.dumps(fingerprint):
+        raise GraphQLError("idempotency key already used with different arguments")
+    return json.loads(row[1])
+
+
+def _claim_shared_key(conn, operation, key, fingerprint):
+    # ligne "en cours" (result vide) insérée dans la transaction de l'écriture : elle n'est
+    # visible des autres workers qu'une fois commitée avec son résultat, ou disparaît au ROLLBACK
+    now = time.time()
+    conn.execute("DELETE FROM idempotency WHERE expires_at <= ?", (now,))
+    claimed = conn.execute(
+        "INSERT OR IGNORE INTO idempotency"
+        " (operation, key, fingerprint, result, expires_at) VALUES (?, ?, ?, '', ?)",
+        (operation, key, json.dumps(fingerprint), now + IDEMPOTENCY_TTL),
+    ).rowcount
+    if claimed:
+        return
+    stored_fingerprint, result = conn.execute(
+        "SELECT fingerprint, result FROM idempotency WHERE operation = ? AND key = ?",
+        (operation, key),
+    ).fetchone()
+    if stored_fingerprint != json.dumps(fingerprint):
+        raise GraphQLError("idempotency key already used with different arguments")
+    raise _SharedReplay(json.loads(result))
+
+
+def _store_shared_result(conn, idem, result):
+    operation, key, _ = idem
+    conn.execute(
+        "UPDATE idempotency SET result = ? WHERE operation = ? AND key = ?",
+        (json.dumps(result), operation, key),
+    )
+    conn.execute(
+        "DELETE FROM idempotency WHERE rowid IN ("
+        " SELECT rowid FROM idempotency ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+        (IDEMPOTENCY_MAX_KEYS,),
+    )
+
+
+@contextmanager
+def booking_transaction(idem=None):
+    """Transaction d'écriture SQLite ; avec idem, clé réservée, écriture et résultat sont commités ensemble."""
+    with sqlite_transaction() as conn:
+        if idem is not None:
+            _claim_shared_key(conn, *idem)
+        yield conn
+
+
+def all_bookings() -> List[Dict]:
+    if USE_SQLITE:
+        rows = sqlite_conn().execute(
+            "SELECT userid, date, movie FROM bookings ORDER BY rowid"
+        )
+        return _rows_to_bookings(rows)
+    return bookings
+
+
 def find_user_booking(userid: str):
+    if USE_SQLITE:
+        rows = sqlite_conn().execute(
+            "SELECT userid, date, movie FROM bookings WHERE userid = ? ORDER BY rowid",
+            (userid,),
+        )
+        found = _rows_to_bookings(rows)
+        return found[0] if found else None
     for booking in bookings:
         if booking["userid"] == userid:
             return booking
@@ -163,7 +512,7 @@ mutation = MutationType()
 @query.field("bookings")
 def resolve_bookings(_, info):
     require_admin(info)
-    return bookings
+    return all_bookings()
 
 
 @query.field("booking")
@@ -194,6 +543,23 @@ def resolve_booking_details(_, info, userid):
 
     return {"userid": userid, "dates": detailed_dates}
 
+def count_movies_for_date(date: str) -> Dict[str, int]:
+    if USE_SQLITE:
+        rows = sqlite_conn().execute(
+            "SELECT movie, COUNT(*) FROM bookings WHERE date = ?"
+            " GROUP BY movie ORDER BY MIN(rowid)",
+            (date,),
+        )
+        return dict(rows)
+    counts = {}
+    for booking in bookings:
+        for d in booking.get("dates", []):
+            if d.get("date") == date:
+                for movie_id in d.get("movies", []):
+                    counts[movie_id] = counts.get(movie_id, 0) + 1
+    return counts
+
+
 #Présentation Bernat
 @query.field("statsMoviesForDate")
 def resolve_stats_movies_for_date(_, info, date):
@@ -203,12 +569,7 @@ def resolve_stats_movies_for_date(_, info, date):
         raise GraphQLError("invalid date format, expected YYYYMMDD")
 
     #récupère film à la bonne date
-    counts = {}
-    for booking in bookings:
-        for d in booking.get("dates", []):
-            if d.get("date") == date:
-                for movie_id in d.get("movies", []):
-                    counts[movie_id] = counts.get(movie_id, 0) + 1
+    counts = count_movies_for_date(date)
 
     # récupère info chaque films à la bonne date
     items = []
@@ -227,7 +588,16 @@ def resolve_stats_movies_for_date(_, info, date):
 
 # Présentation Johanne
 @mutation.field("addBooking")
-def resolve_add_booking(_, info, userid, date, movies):
+def resolve_add_booking(_, info, userid, date, movies, idempotencyKey=None):
+    key = get_idempotency_key(info, idempotencyKey)
+    fingerprint = (userid, date, tuple(movies))
+    return run_idempotent(
+        "addBooking", key, fingerprint,
+        lambda idem: add_booking(userid, date, movies, idem),
+    )
+
+
+def add_booking(userid, date, movies, idem=None):
     if not validate_date_str(date):
         raise GraphQLError("invalid date format, expected YYYYMMDD")
 
@@ -246,50 +616,107 @@ def resolve_add_booking(_, info, userid, date, movies):
         if info_movie is None:
             raise GraphQLError(f"movie id '{movie_id}' does not exist in Movie service")
 
-    entry = find_user_booking(userid)
-    if entry is None:
-        entry = {"userid": userid, "dates": []}
-        bookings.append(entry)
-
-    dentry = find_date_entry(entry, date)
-    if dentry is None:
-        dentry = {"date": date, "movies": []}
-        entry["dates"].append(dentry)
-
-    for movie_id in to_add:
-        if movie_id not in dentry["movies"]:
-            dentry["movies"].append(movie_id)
-
-    write()
-
-    return {
-        "message": "booking added",
-        "userid": userid,
-        "date": date,
-        "movies": dentry["movies"],
-    }
+    if USE_SQLITE:
+        # une ligne par film réservé : pas de réécriture de toute la réservation
+        with booking_transaction(idem) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO bookings (userid, date, movie) VALUES (?, ?, ?)",
+                [(userid, date, movie_id) for movie_id in to_add],
+            )
+            booked = [row[0] for row in conn.execute(
+                "SELECT movie FROM bookings WHERE userid = ? AND date = ? ORDER BY rowid",
+                (userid, date),
+            )]
+            result = {
+                "message": "booking added",
+                "userid": userid,
+                "date": date,
+                "movies": booked,
+            }
+            if idem is not None:
+                _store_shared_result(conn, idem, result)
+        return result
+
+    with _bookings_lock:
+        entry = find_user_booking(userid)
+        if entry is None:
+            entry = {"userid": userid, "dates": []}
+            bookings.append(entry)
+
+        dentry = find_date_entry(entry, date)
+        if dentry is None:
+            dentry = {"date": date, "movies": []}
+            entry["dates"].append(dentry)
+
+        for movie_id in to_add:
+            if movie_id not in dentry["movies"]:
+                dentry["movies"].append(movie_id)
+
+        write()
+
+        return {
+            "message": "booking added",
+            "userid": userid,
+            "date": date,
+            "movies": list(dentry["movies"]),
+        }
 
 
 @mutation.field("deleteBooking")
-def resolve_delete_booking(_, info, userid, date, movieid):
-    entry = find_user_booking(userid)
-    if entry is None:
-        raise GraphQLError("user has no bookings")
-
-    date_entry = find_date_entry(entry, date)
-    if date_entry is None:
-        raise GraphQLError("no bookings for this date")
+def resolve_delete_booking(_, info, userid, date, movieid, idempotencyKey=None):
+    key = get_idempotency_key(info, idempotencyKey)
+    fingerprint = (userid, date, movieid)
+    return run_idempotent(
+        "deleteBooking", key, fingerprint,
+        lambda idem: delete_booking(userid, date, movieid, idem),
+    )
+
+
+def delete_booking(userid, date, movieid, idem=None):
+    if USE_SQLITE:
+        with booking_transaction(idem) as conn:
+            cur = conn.execute(
+                "DELETE FROM bookings WHERE userid = ? AND date = ? AND movie = ?",
+                (userid, date, movieid),
+            )
+            if cur.rowcount == 0:
+                # même messages d'erreur qu'en mode JSON
+                if conn.execute("SELECT 1 FROM bookings WHERE userid = ? LIMIT 1", (userid,)).fetchone() is None:
+                    raise GraphQLError("user has no bookings")
+                if conn.execute(
+                    "SELECT 1 FROM bookings WHERE userid = ? AND date = ? LIMIT 1", (userid, date)
+                ).fetchone() is None:
+                    raise GraphQLError("no bookings for this date")
+                raise GraphQLError("movie not booked on this date")
+            result = {
+                "message": "booking deleted",
+                "userid": userid,
+                "date": date,
+                "movie": movieid,
+            }
+            if idem is not None:
+                _store_shared_result(conn, idem, result)
+        return result
+
+    with _bookings_lock:
+        entry = find_user_booking(userid)
+        if entry is None:
+            raise GraphQLError("user has no bookings")
+
+        date_entry = find_date_entry(entry, date)
+        if date_entry is None:
+            raise GraphQLError("no bookings for this date")
 
-    try:
-        date_entry["movies"].remove(movieid)
-    except ValueError:
-        raise GraphQLError("movie not booked on this date")
+        try:
+            date_entry["movies"].remove(movieid)
+        except ValueError:
+            raise GraphQLError("movie not booked on this date")
 
-    # On garde seulement les dates où il reste au moins un film dans la liste movies
-    new_dates = [d for d in entry["dates"] if len(d.get("movies", [])) > 0]
-    entry["dates"] = new_dates
+        # On garde seulement les dates où il reste au moins un film dans la liste movies
+        new_dates = [d for d in entry["dates"] if len(d.get("movies", [])) > 0]
+        entry["dates"] = new_dates
 
-    write()
+        write()
 
     return {
         "message": "booking deleted",
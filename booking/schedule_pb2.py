@@ -25,29 +25,57 @@ _sym_db = _symbol_database.Default()
 from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eschedule.proto\x12\x08schedule\x1a\x1bgoogle/protobuf/empty.proto\"\x1b\n\x0b\x44\x61teRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\"-\n\rScheduleEntry\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"C\n\x15ListSchedulesResponse\x12*\n\tschedules\x18\x01 \x03(\x0b\x32\x17.schedule.ScheduleEntry\"5\n\x15\x43reateScheduleRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"5\n\x15UpdateScheduleRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"j\n\x16\x44\x65leteScheduleResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12.\n\rdeleted_entry\x18\x03 \x01(\x0b\x32\x17.schedule.ScheduleEntry\"D\n\x05Movie\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06rating\x18\x03 \x01(\x01\x12\x10\n\x08\x64irector\x18\x04 \x01(\t\"b\n\x11\x42\x65stRatedResponse\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x1e\n\x05movie\x18\x02 \x01(\x0b\x32\x0f.schedule.Movie\x12\x0e\n\x06rating\x18\x03 \x01(\x01\x12\x0f\n\x07message\x18\x04 \x01(\t2\xc7\x03\n\x08Schedule\x12J\n\x0fGetAllSchedules\x12\x16.google.protobuf.Empty\x1a\x1f.schedule.ListSchedulesResponse\x12\x43\n\x11GetScheduleByDate\x12\x15.schedule.DateRequest\x1a\x17.schedule.ScheduleEntry\x12J\n\x0e\x43reateSchedule\x12\x1f.schedule.CreateScheduleRequest\x1a\x17.schedule.ScheduleEntry\x12J\n\x0eUpdateSchedule\x12\x1f.schedule.UpdateScheduleRequest\x1a\x17.schedule.ScheduleEntry\x12I\n\x0e\x44\x65leteSchedule\x12\x15.schedule.DateRequest\x1a .schedule.DeleteScheduleResponse\x12G\n\x11GetBestRatedMovie\x12\x15.schedule.DateRequest\x1a\x1b.schedule.BestRatedResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0eschedule.proto\x12\x08schedule\x1a\x1bgoogle/protobuf/empty.proto\"\x1b\n\x0b\x44\x61teRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\"2\n\x0cRangeRequest\x12\x11\n\tfrom_date\x18\x01 \x01(\t\x12\x0f\n\x07to_date\x18\x02 \x01(\t\"\x1d\n\x0c\x44\x61tesRequest\x12\r\n\x05\x64\x61tes\x18\x01 \x03(\t\"I\n\x11MovieDatesRequest\x12\x10\n\x08movie_id\x18\x01 \x01(\t\x12\x11\n\tfrom_date\x18\x02 \x01(\t\x12\x0f\n\x07to_date\x18\x03 \x01(\t\"5\n\x12MovieDatesResponse\x12\x10\n\x08movie_id\x18\x01 \x01(\t\x12\r\n\x05\x64\x61tes\x18\x02 \x03(\t\"$\n\x0cWatchRequest\x12\x14\n\x0c\x66rom_version\x18\x01 \x01(\x03\"\xd1\x01\n\x0eScheduleChange\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12\x31\n\x04type\x18\x02 \x01(\x0e\x32#.schedule.ScheduleChange.ChangeType\x12&\n\x05\x65ntry\x18\x03 \x01(\x0b\x32\x17.schedule.ScheduleEntry\"S\n\nChangeType\x12\x0c\n\x08SNAPSHOT\x10\x00\x12\x10\n\x0cSNAPSHOT_END\x10\x01\x12\x0b\n\x07\x43REATED\x10\x02\x12\x0b\n\x07UPDATED\x10\x03\x12\x0b\n\x07\x44\x45LETED\x10\x04\"-\n\rScheduleEntry\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"C\n\x15ListSchedulesResponse\x12*\n\tschedules\x18\x01 \x03(\x0b\x32\x17.schedule.ScheduleEntry\"R\n\nDateResult\x12\r\n\x05\x66ound\x18\x01 \x01(\x08\x12&\n\x05\x65ntry\x18\x02 \x01(\x0b\x32\x17.schedule.ScheduleEntry\x12\r\n\x05\x65rror\x18\x03 \x01(\t\"\xa2\x01\n\x18SchedulesByDatesResponse\x12@\n\x07results\x18\x01 \x03(\x0b\x32/.schedule.SchedulesByDatesResponse.ResultsEntry\x1a\x44\n\x0cResultsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12#\n\x05value\x18\x02 \x01(\x0b\x32\x14.schedule.DateResult:\x02\x38\x01\"5\n\x15\x43reateScheduleRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"5\n\x15UpdateScheduleRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x0e\n\x06movies\x18\x02 \x03(\t\"j\n\x16\x44\x65leteScheduleResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12.\n\rdeleted_entry\x18\x03 \x01(\x0b\x32\x17.schedule.ScheduleEntry\"D\n\x05Movie\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06rating\x18\x03 \x01(\x01\x12\x10\n\x08\x64irector\x18\x04 \x01(\t\"*\n\x0fTopRatedRequest\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\t\n\x01k\x18\x02 \x01(\x05\"R\n\x10TopRatedResponse\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x1f\n\x06movies\x18\x02 \x03(\x0b\x32\x0f.schedule.Movie\x12\x0f\n\x07message\x18\x03 \x01(\t\"L\n\x14MoviesChangedRequest\x12\x1f\n\x06movies\x18\x01 \x03(\x0b\x32\x0f.schedule.Movie\x12\x13\n\x0b\x64\x65leted_ids\x18\x02 \x03(\t\"b\n\x11\x42\x65stRatedResponse\x12\x0c\n\x04\x64\x61te\x18\x01 \x01(\t\x12\x1e\n\x05movie\x18\x02 \x01(\x0b\x32\x0f.schedule.Movie\x12\x0e\n\x06rating\x18\x03 \x01(\x01\x12\x0f\n\x07message\x18\x04 \x01(\t2\xe0\x07\n\x08Schedule\x12J\n\x0fGetAllSchedules\x12\x16.google.protobuf.Empty\x1a\x1f.schedule.ListSchedulesResponse\x12\x43\n\x11GetScheduleByDate\x12\x15.schedule.DateRequest\x1a\x17.schedule.ScheduleEntry\x12J\n\x0e\x43reateSchedule\x12\x1f.schedule.CreateScheduleRequest\x1a\x17.schedule.ScheduleEntry\x12J\n\x0eUpdateSchedule\x12\x1f.schedule.UpdateScheduleRequest\x1a\x17.schedule.ScheduleEntry\x12I\n\x0e\x44\x65leteSchedule\x12\x15.schedule.DateRequest\x1a .schedule.DeleteScheduleResponse\x12G\n\x11GetBestRatedMovie\x12\x15.schedule.DateRequest\x1a\x1b.schedule.BestRatedResponse\x12K\n\x12GetTopRatedForDate\x12\x19.schedule.TopRatedRequest\x1a\x1a.schedule.TopRatedResponse\x12M\n\x13NotifyMoviesChanged\x12\x1e.schedule.MoviesChangedRequest\x1a\x16.google.protobuf.Empty\x12\x44\n\x0fStreamSchedules\x12\x16.schedule.RangeRequest\x1a\x17.schedule.ScheduleEntry0\x01\x12N\n\x13GetSchedulesInRange\x12\x16.schedule.RangeRequest\x1a\x1f.schedule.ListSchedulesResponse\x12Q\n\x13GetSchedulesByDates\x12\x16.schedule.DatesRequest\x1a\".schedule.SchedulesByDatesResponse\x12M\n\x10GetDatesForMovie\x12\x1b.schedule.MovieDatesRequest\x1a\x1c.schedule.MovieDatesResponse\x12\x43\n\rWatchSchedule\x12\x16.schedule.WatchRequest\x1a\x18.schedule.ScheduleChange0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'schedule_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_SCHEDULESBYDATESRESPONSE_RESULTSENTRY']._loaded_options = None
+  _globals['_SCHEDULESBYDATESRESPONSE_RESULTSENTRY']._serialized_options = b'8\001'
   _globals['_DATEREQUEST']._serialized_start=57
   _globals['_DATEREQUEST']._serialized_end=84
-  _globals['_SCHEDULEENTRY']._serialized_start=86
-  _globals['_SCHEDULEENTRY']._serialized_end=131
-  _globals['_LISTSCHEDULESRESPONSE']._serialized_start=133
-  _globals['_LISTSCHEDULESRESPONSE']._serialized_end=200
-  _globals['_CREATESCHEDULEREQUEST']._serialized_start=202
-  _globals['_CREATESCHEDULEREQUEST']._serialized_end=255
-  _globals['_UPDATESCHEDULEREQUEST']._serialized_start=257
-  _globals['_UPDATESCHEDULEREQUEST']._serialized_end=310
-  _globals['_DELETESCHEDULERESPONSE']._serialized_start=312
-  _globals['_DELETESCHEDULERESPONSE']._serialized_end=418
-  _globals['_MOVIE']._serialized_start=420
-  _globals['_MOVIE']._serialized_end=488
-  _globals['_BESTRATEDRESPONSE']._serialized_start=490
-  _globals['_BESTRATEDRESPONSE']._serialized_end=588
-  _globals['_SCHEDULE']._serialized_start=591
-  _globals['_SCHEDULE']._serialized_end=1046
+  _globals['_RANGEREQUEST']._serialized_start=86
+  _globals['_RANGEREQUEST']._serialized_end=136
+  _globals['_DATESREQUEST']._serialized_start=138
+  _globals['_DATESREQUEST']._serialized_end=167
+  _globals['_MOVIEDATESREQUEST']._serialized_start=169
+  _globals['_MOVIEDATESREQUEST']._serialized_end=242
+  _globals['_MOVIEDATESRESPONSE']._serialized_start=244
+  _globals['_MOVIEDATESRESPONSE']._serialized_end=297
+  _globals['_WATCHREQUEST']._serialized_start=299
+  _globals['_WATCHREQUEST']._serialized_end=335
+  _globals['_SCHEDULECHANGE']._serialized_start=338
+  _globals['_SCHEDULECHANGE']._serialized_end=547
+  _globals['_SCHEDULECHANGE_CHANGETYPE']._serialized_start=464
+  _globals['_SCHEDULECHANGE_CHANGETYPE']._serialized_end=547
+  _globals['_SCHEDULEENTRY']._serialized_start=549
+  _globals['_SCHEDULEENTRY']._serialized_end=594
+  _globals['_LISTSCHEDULESRESPONSE']._serialized_start=596
+  _globals['_LISTSCHEDULESRESPONSE']._serialized_end=663
+  _globals['_DATERESULT']._serialized_start=665
+  _globals['_DATERESULT']._serialized_end=747
+  _globals['_SCHEDULESBYDATESRESPONSE']._serialized_start=750
+  _globals['_SCHEDULESBYDATESRESPONSE']._serialized_end=912
+  _globals['_SCHEDULESBYDATESRESPONSE_RESULTSENTRY']._serialized_start=844
+  _globals['_SCHEDULESBYDATESRESPONSE_RESULTSENTRY']._serialized_end=912
+  _globals['_CREATESCHEDULEREQUEST']._serialized_start=914
+  _globals['_CREATESCHEDULEREQUEST']._serialized_end=967
+  _globals['_UPDATESCHEDULEREQUEST']._serialized_start=969
+  _globals['_UPDATESCHEDULEREQUEST']._serialized_end=1022
+  _globals['_DELETESCHEDULERESPONSE']._serialized_start=1024
+  _globals['_DELETESCHEDULERESPONSE']._serialized_end=1130
+  _globals['_MOVIE']._serialized_start=1132
+  _globals['_MOVIE']._serialized_end=1200
+  _globals['_TOPRATEDREQUEST']._serialized_start=1202
+  _globals['_TOPRATEDREQUEST']._serialized_end=1244
+  _globals['_TOPRATEDRESPONSE']._serialized_start=1246
+  _globals['_TOPRATEDRESPONSE']._serialized_end=1328
+  _globals['_MOVIESCHANGEDREQUEST']._serialized_start=1330
+  _globals['_MOVIESCHANGEDREQUEST']._serialized_end=1406
+  _globals['_BESTRATEDRESPONSE']._serialized_start=1408
+  _globals['_BESTRATEDRESPONSE']._serialized_end=1506
+  _globals['_SCHEDULE']._serialized_start=1509
+  _globals['_SCHEDULE']._serialized_end=2501
 # @@protoc_insertion_point(module_scope)
@@ -0,0 +1,17 @@
+-- Schéma SQLite du service booking (STORAGE=sqlite), lu aussi par import_to_mongo.py --backend sqlite
+CREATE TABLE IF NOT EXISTS bookings (
+  userid TEXT NOT NULL,
+  date TEXT NOT NULL,
+  movie TEXT NOT NULL,
+  PRIMARY KEY (userid, date, movie)
+);
+CREATE INDEX IF NOT EXISTS bookings_date ON bookings(date);
+CREATE TABLE IF NOT EXISTS idempotency (
+  operation TEXT NOT NULL,
+  key TEXT NOT NULL,
+  fingerprint TEXT NOT NULL,
+  result TEXT NOT NULL,
+  expires_at REAL NOT NULL,
+  PRIMARY KEY (operation, key)
+);
+CREATE INDEX IF NOT EXISTS idempotency_expires ON idempotency(expires_at);
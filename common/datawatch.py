@@ -0,0 +1,105 @@
+"""Rechargement des fichiers JSON modifiés sur le disque.
+
+Un thread compare régulièrement la signature (mtime, taille, inode) des fichiers
+surveillés. Quand un fichier change hors du service, ce thread le relit et le
+parse lui-même, puis appelle apply(données) qui remplace l'état en mémoire d'un
+seul coup : les lectures ne sont jamais bloquées, les écritures attendent au plus
+l'échange, et aucune requête ne paie le parsing.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# secondes entre deux vérifications ; 0 = pas de surveillance
+DATA_WATCH_INTERVAL = float(os.environ.get("DATA_WATCH_INTERVAL", "1"))
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+# un verrou par fichier : deux requêtes qui écrivent en même temps partageraient le même .tmp
+_write_locks = {}
+_write_locks_guard = threading.Lock()
+
+
+def write_json_atomic(path, data):
+    """Écrit via un fichier temporaire puis os.replace : un lecteur ne voit jamais un fichier à moitié écrit."""
+    with _write_locks_guard:
+        lock = _write_locks.setdefault(path, threading.Lock())
+    with lock:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class DataWatcher:
+    def __init__(self, interval=DATA_WATCH_INTERVAL):
+        self.interval = interval
+        # chemin -> [signature connue, clé racine du JSON, apply, verrou du service]
+        self._files = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def watch(self, path, key, apply, lock=None):
+        """Appelle apply(contenu[key]) après chaque modification de path faite hors du service.
+
+        lock : verrou que le service tient pendant chaque modification + écriture du
+        fichier. apply est appelé sous ce verrou, et abandonné si le service a écrit le
+        fichier pendant la lecture (son écriture est plus récente que ce qui a été lu).
+        """
+        with self._lock:
+            self._files[path] = [_signature(path), key, apply, lock]
+            if self.interval > 0 and self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="datawatch", daemon=True)
+                self._thread.start()
+
+    def written(self, path):
+        """À appeler après une écriture du service lui-même : ce n'est pas un changement externe."""
+        with self._lock:
+            if path in self._files:
+                self._files[path][0] = _signature(path)
+
+    def check(self):
+        """Un passage de vérification sur tous les fichiers surveillés."""
+        with self._lock:
+            files = [(path, *entry) for path, entry in self._files.items()]
+        for path, known, key, apply, lock in files:
+            signature = _signature(path)
+            if signature is None or signature == known:
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)[key]
+            except (OSError, ValueError, KeyError, TypeError):
+                # fichier en cours d'écriture ou invalide : nouvel essai au prochain passage
+                continue
+            with lock or nullcontext():
+                with self._lock:
+                    if self._files[path][0] != known:
+                        # écrit par le service pendant la lecture
+                        continue
+                    # signature d'avant la lecture : une modification pendant la lecture sera revue
+                    self._files[path][0] = signature
+                try:
+                    apply(data)
+                except Exception as e:
+                    print(f"datawatch: reload of {path} failed: {e}")
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+
+watcher = DataWatcher()
@@ -0,0 +1,28 @@
+"""Configuration gunicorn des services Flask lancés en plusieurs workers (booking, user).
+
+gunicorn -c gunicorn.conf.py -b 0.0.0.0:3201 booking:app
+
+WORKERS : nombre de processus. Par défaut 4 avec STORAGE=sqlite, la base étant la
+source de vérité partagée ; 1 en JSON ou Mongo, où chaque processus garde sa propre
+copie des données en mémoire. THREADS : requêtes simultanées par worker (les
+services attendent les autres services pendant une requête).
+"""
+import os
+import shutil
+
+_storage = os.environ.get("STORAGE", "").lower() or (
+    "mongo" if os.environ.get("USE_MONGO", "false").lower() == "true" else "json"
+)
+
+workers = int(os.environ.get("WORKERS") or (4 if _storage == "sqlite" else 1))
+threads = int(os.environ.get("THREADS", "8"))
+# chaque worker importe l'application après le fork : ses threads (écritures différées, métriques) et son METRICS_DIR/<pid>.json
+preload_app = False
+accesslog = "-"
+
+
+def on_starting(server):
+    # METRICS_DIR : les fichiers d'un démarrage précédent ne doivent pas s'additionner aux nouveaux compteurs
+    metrics_dir = os.environ.get("METRICS_DIR")
+    if metrics_dir:
+        shutil.rmtree(metrics_dir, ignore_errors=True)
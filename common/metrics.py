@@ -0,0 +1,385 @@
+"""Métriques des services au format texte Prometheus.
+
+Chaque thread écrit dans son propre dict (shard) ; un scrape additionne tous les
+shards. Le serveur de développement Flask lance un thread par requête : à la fin
+d'un thread son shard est rendu à une liste libre et repris tel quel par le
+thread suivant. Un nouveau thread ne prend un verrou que quand tous les shards
+sont occupés (plus de threads simultanés qu'auparavant).
+METRICS=false désactive toutes les mesures.
+
+Plusieurs processus (gunicorn -w N) : chaque worker a ses propres compteurs. Avec
+METRICS_DIR, chaque worker écrit ses totaux dans METRICS_DIR/<pid>.json (toutes les
+METRICS_DUMP_INTERVAL secondes et à chaque scrape qu'il sert) et un scrape
+additionne tous les fichiers, ceux des workers terminés compris : les compteurs
+ne reculent pas quel que soit le worker qui répond.
+"""
+import atexit
+import bisect
+import json
+import os
+import re
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.environ.get("METRICS", "true").lower() == "true"
+# dossier partagé par les workers d'un même service ("" = un seul processus) ; à vider avant le démarrage
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_DUMP_INTERVAL = float(os.environ.get("METRICS_DUMP_INTERVAL", "1"))
+
+# secondes ; la dernière case (+Inf) est implicite
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Lease:
+    """Shard prêté à un thread ; rendu à la liste libre quand le thread se termine."""
+
+    __slots__ = ("data", "free")
+
+    def __init__(self, data, free):
+        self.data = data
+        self.free = free
+
+    def __del__(self):
+        # appelé quand threading.local libère les données du thread terminé
+        self.free.append(self.data)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+        self._local = threading.local()
+        # tous les shards créés (jamais retirés) et ceux qu'aucun thread n'utilise
+        self._shards = []
+        self._free = []
+        self._lock = threading.Lock()
+        # METRICS_DIR : un seul (collect + écriture) à la fois, le fichier ne recule jamais
+        self._dump_lock = threading.Lock()
+
+    def shard(self):
+        """Dict du thread courant : (métrique, labels) -> valeur ou liste de cases."""
+        try:
+            return self._local.lease.data
+        except AttributeError:
+            try:
+                # list.pop est atomique : pas de verrou pour reprendre un shard libre
+                data = self._free.pop()
+            except IndexError:
+                data = {}
+                with self._lock:
+                    self._shards.append(data)
+            self._local.lease = _Lease(data, self._free)
+            return data
+
+    def collect(self):
+        """Somme de tous les shards (les copies de dict sont atomiques sous le GIL)."""
+        with self._lock:
+            shards = [data.copy() for data in self._shards]
+        total = {}
+        for data in shards:
+            _merge(total, data)
+        return total
+
+    def dump(self):
+        """Écrit les totaux de ce processus dans METRICS_DIR/<pid>.json et les renvoie."""
+        with self._dump_lock:
+            values = self.collect()
+            path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump([[name, list(labels), value] for (name, labels), value in values.items()], f)
+            os.replace(path + ".tmp", path)
+        return values
+
+    def collect_all(self):
+        """Totaux de ce processus (écrits au passage) + ceux des autres fichiers de METRICS_DIR."""
+        own = f"{os.getpid()}.json"
+        total = {}
+        _merge(total, self.dump())
+        for name in os.listdir(METRICS_DIR):
+            if not name.endswith(".json") or name == own:
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, name), encoding="utf-8") as f:
+                    rows = json.load(f)
+            except (OSError, ValueError):
+                continue
+            _merge(total, {(metric, tuple(labels)): value for metric, labels, value in rows})
+        return total
+
+    def render(self):
+        values = self.collect_all() if METRICS_DIR else self.collect()
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render(values))
+        return "\n".join(lines) + "\n"
+
+
+def _merge(into, data):
+    for key, value in data.items():
+        if isinstance(value, list):
+            current = into.get(key)
+            if current is None:
+                into[key] = list(value)
+            else:
+                for i, v in enumerate(value):
+                    current[i] += v
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+REGISTRY = Registry()
+
+
+def _dump_loop():
+    while True:
+        time.sleep(METRICS_DUMP_INTERVAL)
+        try:
+            REGISTRY.dump()
+        except OSError as e:
+            print(f"metrics: failed to write {METRICS_DIR}: {e}")
+
+
+if METRICS_ENABLED and METRICS_DIR:
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    threading.Thread(target=_dump_loop, name="metrics-dump", daemon=True).start()
+    atexit.register(REGISTRY.dump)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name, help, labels=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._registry = registry
+        registry.metrics.append(self)
+
+    def inc(self, *labels, amount=1):
+        if not METRICS_ENABLED:
+            return
+        data = self._registry.shard()
+        key = (self.name, labels)
+        data[key] = data.get(key, 0) + amount
+
+    def values(self, collected):
+        return {key[1]: v for key, v in collected.items() if key[0] == self.name}
+
+    def render(self, collected):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in sorted(self.values(collected).items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._registry = registry
+        registry.metrics.append(self)
+
+    def observe(self, value, *labels):
+        if not METRICS_ENABLED:
+            return
+        data = self._registry.shard()
+        key = (self.name, labels)
+        cells = data.get(key)
+        if cells is None:
+            # une case par borne + +Inf, puis somme et nombre
+            cells = data[key] = [0] * (len(self.buckets) + 3)
+        cells[bisect.bisect_left(self.buckets, value)] += 1
+        cells[-2] += value
+        cells[-1] += 1
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def render(self, collected):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        series = {key[1]: v for key, v in collected.items() if key[0] == self.name}
+        for labels, cells in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), cells):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {cells[-2]}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cells[-1]}"
+
+
+class HitRatio:
+    """Jauge calculée au scrape : hits / (hits + misses) d'un compteur {cache, result}."""
+
+    def __init__(self, name, help, counter, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.counter = counter
+        registry.metrics.append(self)
+
+    def render(self, collected):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        totals = {}
+        for (cache, result), value in self.counter.values(collected).items():
+            hits, all_ = totals.get(cache, (0, 0))
+            totals[cache] = (hits + (value if result == "hit" else 0), all_ + value)
+        for cache, (hits, all_) in sorted(totals.items()):
+            yield f'{self.name}{{cache="{_escape(cache)}"}} {hits / all_ if all_ else 0.0}'
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        outcome = "ok" if exc_type is None else "error"
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels, outcome)
+        return False
+
+
+# ---------- métriques communes ----------
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route (or GraphQL operation), method and status.",
+                        ["route", "method", "status"])
+HTTP_DURATION = Histogram("http_request_duration_seconds", "HTTP request latency by route (or GraphQL operation).",
+                          ["route", "method"])
+GRPC_REQUESTS = Counter("grpc_requests_total", "gRPC calls by method and status code.", ["method", "code"])
+GRPC_DURATION = Histogram("grpc_request_duration_seconds", "gRPC call latency by method (whole stream for streaming RPCs).",
+                          ["method"])
+DOWNSTREAM_DURATION = Histogram("downstream_duration_seconds", "Latency of calls to other services.", ["call", "outcome"])
+STORAGE_DURATION = Histogram("storage_duration_seconds", "Storage load and save durations.", ["op", "outcome"])
+CACHE_REQUESTS = Counter("cache_requests_total", "Cache lookups by cache and result (hit or miss).", ["cache", "result"])
+CACHE_RATIO = HitRatio("cache_hit_ratio", "Share of cache lookups that were hits since start.", CACHE_REQUESTS)
+
+
+def timed(histogram, *labels):
+    """Décorateur : durée de chaque appel dans histogram{labels..., outcome}."""
+    def decorate(fn):
+        if not METRICS_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                histogram.observe(time.perf_counter() - start, *labels, outcome)
+        return wrapper
+    return decorate
+
+
+def cache_lookup(name, hit):
+    CACHE_REQUESTS.inc(name, "hit" if hit else "miss")
+
+
+# ---------- Flask ----------
+
+_GRAPHQL_FIELD = re.compile(r"^\s*(?:(?:query|mutation|subscription)\b[^{]*)?\{\s*(?:\w+\s*:\s*)?(\w+)")
+_operations = {}
+
+
+def graphql_root_fields(schema):
+    """Noms des champs racine (query, mutation, subscription) d'un schéma graphql-core."""
+    types = (schema.query_type, schema.mutation_type, schema.subscription_type)
+    return frozenset(name for t in types if t is not None for name in t.fields)
+
+
+def graphql_operation(body, fields):
+    """Premier champ racine de la requête GraphQL ("graphql:movie"), mémorisé par texte de requête.
+
+    Le nom vient du texte envoyé par le client : tout ce qui n'est pas un champ racine
+    du schéma devient "graphql:unknown", le nombre de séries reste borné.
+    """
+    query = body.get("query") if isinstance(body, dict) else None
+    if not isinstance(query, str):
+        return "graphql:invalid"
+    name = _operations.get(query)
+    if name is None:
+        m = _GRAPHQL_FIELD.match(query)
+        name = "graphql:" + (m.group(1) if m and m.group(1) in fields else "unknown")
+        if len(_operations) < 1000:
+            _operations[query] = name
+    return name
+
+
+def install_flask(app, graphql_schema=None):
+    """Route GET /metrics et mesure de chaque requête (route, ou opération GraphQL sur /graphql)."""
+    from flask import Response, g, request
+
+    fields = graphql_root_fields(graphql_schema) if graphql_schema is not None else frozenset()
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics_endpoint():
+        return Response(REGISTRY.render(), mimetype=CONTENT_TYPE.split(";")[0], content_type=CONTENT_TYPE)
+
+    if not METRICS_ENABLED:
+        return
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_end(response):
+        start = getattr(g, "_metrics_start", None)
+        if start is not None:
+            if request.path == "/graphql":
+                route = graphql_operation(request.get_json(silent=True), fields)
+            else:
+                route = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            HTTP_REQUESTS.inc(route, request.method, str(response.status_code))
+            HTTP_DURATION.observe(time.perf_counter() - start, route, request.method)
+        return response
+
+
+# ---------- serveur HTTP dédié (service gRPC) ----------
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve(port):
+    """GET /metrics sur un port à part, dans un thread (0 = désactivé)."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
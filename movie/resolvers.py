@@ -1,9 +1,20 @@
 import json
 import uuid
 import os
+import sqlite3
+import threading
+from concurrent import futures
+from contextlib import contextmanager
 import requests
 from typing import List, Dict
 
+import grpc
+
+import schedule_pb2
+import schedule_pb2_grpc
+from datawatch import watcher, write_json_atomic
+from metrics import DOWNSTREAM_DURATION, STORAGE_DURATION, cache_lookup, timed
+
 from ariadne import (
     QueryType,
     MutationType,
@@ -16,9 +27,17 @@ from graphql import GraphQLError
 MOVIES_PATH = "./data/movies.json"
 ACTORS_PATH = "./data/actors.json"
 
-USE_MONGO = os.environ.get("USE_MONGO", "false").lower() == "true"
+# STORAGE = json | mongo | sqlite (USE_MONGO=true reste équivalent à STORAGE=mongo)
+STORAGE = os.environ.get("STORAGE", "").lower() or (
+    "mongo" if os.environ.get("USE_MONGO", "false").lower() == "true" else "json"
+)
+USE_MONGO = STORAGE == "mongo"
+USE_SQLITE = STORAGE == "sqlite"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "./data/movie.db")
 MONGO_URL = os.environ.get("MONGO_URL", "")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "appdb")
+# adresse gRPC du service schedule à prévenir des changements de films (vide = pas de notification)
+SCHEDULE_ADDR = os.environ.get("SCHEDULE_ADDR", "")
 _mongo_db = None
 if USE_MONGO:
     try:
@@ -28,19 +47,155 @@ if USE_MONGO:
         _mongo_db = None
 
 
+# ---------- SQLite ----------
+
+# schéma partagé avec import_to_mongo.py --backend sqlite
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql"), encoding="utf-8") as _schema:
+    SQLITE_SCHEMA = _schema.read()
+
+_sqlite_local = threading.local()
+
+
+def sqlite_conn():
+    # une connexion par thread ; en WAL les lecteurs ne bloquent pas l'écrivain
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _sqlite_local.conn = conn
+    return conn
+
+
+@contextmanager
+def sqlite_transaction():
+    # BEGIN IMMEDIATE : prend le verrou d'écriture tout de suite (pas de lecture périmée)
+    conn = sqlite_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _movie_row(movie):
+    return (
+        str(movie["id"]),
+        movie.get("title", ""),
+        movie.get("director", ""),
+        float(movie.get("rating") or 0.0),
+        json.dumps(movie, ensure_ascii=False),
+    )
+
+
+def _actor_row(actor):
+    return (
+        str(actor["id"]),
+        actor.get("firstname"),
+        actor.get("lastname"),
+        actor.get("birthyear"),
+        json.dumps(actor, ensure_ascii=False),
+    )
+
+
+def _sqlite_put_movie(conn, movie):
+    conn.execute(
+        "INSERT INTO movies (id, title, director, rating, doc) VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT(id) DO UPDATE SET title = excluded.title, director = excluded.director,"
+        " rating = excluded.rating, doc = excluded.doc",
+        _movie_row(movie),
+    )
+
+
+def _sqlite_put_actor(conn, actor):
+    conn.execute(
+        "INSERT INTO actors (id, firstname, lastname, birthyear, doc) VALUES (?, ?, ?, ?, ?)"
+        " ON CONFLICT(id) DO UPDATE SET firstname = excluded.firstname, lastname = excluded.lastname,"
+        " birthyear = excluded.birthyear, doc = excluded.doc",
+        _actor_row(actor),
+    )
+    # index film -> acteurs
+    conn.execute("DELETE FROM actor_films WHERE actor_id = ?", (str(actor["id"]),))
+    conn.executemany(
+        "INSERT OR IGNORE INTO actor_films (actor_id, movie_id, position) VALUES (?, ?, ?)",
+        [(str(actor["id"]), mid, i) for i, mid in enumerate(actor.get("films", []))],
+    )
+
+
+def _sqlite_docs(sql, params=()):
+    return [json.loads(doc) for (doc,) in sqlite_conn().execute(sql, params)]
+
+
+def init_sqlite():
+    sqlite_conn().executescript(SQLITE_SCHEMA)
+    # premier démarrage : on importe les JSON (une seule fois, même avec N workers)
+    with sqlite_transaction() as conn:
+        if conn.execute("SELECT 1 FROM movies LIMIT 1").fetchone() is None and os.path.exists(MOVIES_PATH):
+            with open(MOVIES_PATH, "r", encoding="utf-8") as f:
+                for m in json.load(f)["movies"]:
+                    _sqlite_put_movie(conn, m)
+        if conn.execute("SELECT 1 FROM actors LIMIT 1").fetchone() is None and os.path.exists(ACTORS_PATH):
+            with open(ACTORS_PATH, "r", encoding="utf-8") as f:
+                for a in json.load(f)["actors"]:
+                    _sqlite_put_actor(conn, a)
+
+
+if USE_SQLITE:
+    os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
+    init_sqlite()
+
+
 # ---------- Helpers JSON ----------
 
+# ---------- JSON : fichiers gardés en mémoire ----------
+
+# chemin -> contenu parsé ; remplacé par datawatch quand le fichier change sur le disque
+_json_cache: Dict[str, List[Dict]] = {}
+# json / mongo : une modification (lecture, changement, écriture) à la fois, jamais
+# pendant un rechargement par datawatch (qui prend ce verrou)
+_json_lock = threading.RLock()
+
+
+def _json_data(path: str, key: str) -> List[Dict]:
+    data = _json_cache.get(path)
+    cache_lookup("json_file", data is not None)
+    if data is None:
+        # surveillance avant la lecture : une modification pendant la lecture sera rechargée
+        watcher.watch(path, key, lambda loaded: _json_cache.__setitem__(path, loaded), _json_lock)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)[key]
+        _json_cache[path] = data
+    return data
+
+
+def _json_save(path: str, key: str, items: List[Dict]):
+    write_json_atomic(path, {key: items})
+    watcher.written(path)
+    _json_cache[path] = items
+
+
+@timed(STORAGE_DURATION, "load_movies")
 def load_movies() -> List[Dict]:
+    if USE_SQLITE:
+        return _sqlite_docs("SELECT doc FROM movies ORDER BY rowid")
     if USE_MONGO and _mongo_db is not None:
         try:
             return list(_mongo_db.movies.find({}, {"_id": 0}))
         except Exception:
             return []
-    with open(MOVIES_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)["movies"]
+    return _json_data(MOVIES_PATH, "movies")
 
 
+@timed(STORAGE_DURATION, "save_movies")
 def save_movies(movies: List[Dict]):
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            conn.execute("DELETE FROM movies")
+            for m in movies:
+                _sqlite_put_movie(conn, m)
+        return
     if USE_MONGO and _mongo_db is not None:
         try:
             _mongo_db.movies.delete_many({})
@@ -49,21 +204,30 @@ def save_movies(movies: List[Dict]):
             return
         except Exception:
             pass
-    with open(MOVIES_PATH, "w", encoding="utf-8") as f:
-        json.dump({"movies": movies}, f, ensure_ascii=False, indent=2)
+    _json_save(MOVIES_PATH, "movies", movies)
 
 
+@timed(STORAGE_DURATION, "load_actors")
 def load_actors() -> List[Dict]:
+    if USE_SQLITE:
+        return _sqlite_docs("SELECT doc FROM actors ORDER BY rowid")
     if USE_MONGO and _mongo_db is not None:
         try:
             return list(_mongo_db.actors.find({}, {"_id": 0}))
         except Exception:
             return []
-    with open(ACTORS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)["actors"]
+    return _json_data(ACTORS_PATH, "actors")
 
 
+@timed(STORAGE_DURATION, "save_actors")
 def save_actors(actors: List[Dict]):
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            conn.execute("DELETE FROM actors")
+            conn.execute("DELETE FROM actor_films")
+            for a in actors:
+                _sqlite_put_actor(conn, a)
+        return
     if USE_MONGO and _mongo_db is not None:
         try:
             _mongo_db.actors.delete_many({})
@@ -72,13 +236,60 @@ def save_actors(actors: List[Dict]):
             return
         except Exception:
             pass
-    with open(ACTORS_PATH, "w", encoding="utf-8") as f:
-        json.dump({"actors": actors}, f, ensure_ascii=False, indent=2)
+    _json_save(ACTORS_PATH, "actors", actors)
+
+
+# Écritures d'une seule ligne : en SQLite une transaction par acteur,
+# sinon on retombe sur la sauvegarde complète habituelle
+
+@timed(STORAGE_DURATION, "save_actor")
+def save_actor(actor: Dict):
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            _sqlite_put_actor(conn, actor)
+        return
+    with _json_lock:
+        actors = load_actors()
+        for i, a in enumerate(actors):
+            if a["id"] == actor["id"]:
+                actors[i] = actor
+                break
+        else:
+            actors.append(actor)
+        save_actors(actors)
+
+
+def remove_actor(actor_id) -> bool:
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            conn.execute("DELETE FROM actor_films WHERE actor_id = ?", (str(actor_id),))
+            return conn.execute("DELETE FROM actors WHERE id = ?", (str(actor_id),)).rowcount > 0
+    with _json_lock:
+        actors = load_actors()
+        remaining = [a for a in actors if a["id"] != actor_id]
+        if len(remaining) == len(actors):
+            return False
+        save_actors(remaining)
+    return True
 
 
 # ---------- Fonctions Movie ----------
 
 def filter_movies(movie_id=None, title=None, director=None):
+    if USE_SQLITE:
+        clauses, params = [], []
+        if movie_id:
+            clauses.append("id = ?")
+            params.append(str(movie_id))
+        if title:
+            clauses.append("lower(title) = ?")
+            params.append(title.strip().lower())
+        if director:
+            clauses.append("lower(director) = ?")
+            params.append(director.strip().lower())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return _sqlite_docs(f"SELECT doc FROM movies{where} ORDER BY rowid", params)
+
     movies = load_movies()
     result = movies
 
@@ -97,6 +308,9 @@ def filter_movies(movie_id=None, title=None, director=None):
 
 
 def get_movie_by_id(movie_id):
+    if USE_SQLITE:
+        found = _sqlite_docs("SELECT doc FROM movies WHERE id = ?", (str(movie_id),))
+        return found[0] if found else None
     movies = load_movies()
     for m in movies:
         if str(m.get("id")) == str(movie_id):
@@ -104,55 +318,116 @@ def get_movie_by_id(movie_id):
     return None
 
 
+def get_movies_by_ids(movie_ids):
+    ids = [str(mid) for mid in movie_ids]
+    if not ids:
+        return []
+    if USE_SQLITE:
+        placeholders = ",".join("?" * len(ids))
+        movies = _sqlite_docs(f"SELECT doc FROM movies WHERE id IN ({placeholders})", ids)
+    else:
+        movies = load_movies()
+    # une seule lecture du catalogue, puis dict pour les recherches
+    movie_map = {str(m.get("id")): m for m in movies}
+    seen = set()
+    result = []
+    for mid in ids:
+        if mid in movie_map and mid not in seen:
+            seen.add(mid)
+            result.append(movie_map[mid])
+    return result
+
+
 def create_movie(title, director, rating=None):
-    movies = load_movies()
     new_movie = {
         "id": str(uuid.uuid4()),
         "title": title,
         "director": director,
         "rating": float(rating) if rating is not None else 0.0,
     }
-    movies.append(new_movie)
-    save_movies(movies)
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            _sqlite_put_movie(conn, new_movie)
+        return new_movie
+    with _json_lock:
+        movies = load_movies()
+        movies.append(new_movie)
+        save_movies(movies)
     return new_movie
 
 
+def _sqlite_update_movie(movie_id, changes):
+    with sqlite_transaction() as conn:
+        row = conn.execute("SELECT doc FROM movies WHERE id = ?", (str(movie_id),)).fetchone()
+        if row is None:
+            return None
+        m = json.loads(row[0])
+        changes(m)
+        _sqlite_put_movie(conn, m)
+    return m
+
+
 def update_movie(movie_id, title=None, director=None, rating=None):
-    movies = load_movies()
-    for m in movies:
-        if str(m.get("id")) == str(movie_id):
+    if USE_SQLITE:
+        def changes(m):
             if title is not None:
                 m["title"] = title
             if director is not None:
                 m["director"] = director
             if rating is not None:
                 m["rating"] = float(rating)
-            save_movies(movies)
-            return m
+        return _sqlite_update_movie(movie_id, changes)
+    with _json_lock:
+        movies = load_movies()
+        for m in movies:
+            if str(m.get("id")) == str(movie_id):
+                if title is not None:
+                    m["title"] = title
+                if director is not None:
+                    m["director"] = director
+                if rating is not None:
+                    m["rating"] = float(rating)
+                save_movies(movies)
+                return m
     return None
 
 
 def update_movie_rating(movie_id, rating):
-    movies = load_movies()
-    for m in movies:
-        if str(m.get("id")) == str(movie_id):
-            m["rating"] = float(rating)
-            save_movies(movies)
-            return m
+    if USE_SQLITE:
+        return _sqlite_update_movie(movie_id, lambda m: m.update(rating=float(rating)))
+    with _json_lock:
+        movies = load_movies()
+        for m in movies:
+            if str(m.get("id")) == str(movie_id):
+                m["rating"] = float(rating)
+                save_movies(movies)
+                return m
     return None
 
 
 def delete_movie(movie_id):
-    movies = load_movies()
-    for m in movies:
-        if str(m.get("id")) == str(movie_id):
-            movies.remove(m)
-            save_movies(movies)
-            return m
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            row = conn.execute("SELECT doc FROM movies WHERE id = ?", (str(movie_id),)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM movies WHERE id = ?", (str(movie_id),))
+        return json.loads(row[0])
+    with _json_lock:
+        movies = load_movies()
+        for m in movies:
+            if str(m.get("id")) == str(movie_id):
+                movies.remove(m)
+                save_movies(movies)
+                return m
     return None
 
 # Savoir si un film est utilisé par au moins un acteur
 def is_movie_referenced(movie_id):
+    if USE_SQLITE:
+        return sqlite_conn().execute(
+            "SELECT 1 FROM actor_films WHERE movie_id = ? LIMIT 1", (movie_id,)
+        ).fetchone() is not None
     actors = load_actors()
     return any(movie_id in a.get("films", []) for a in actors)
 
@@ -164,6 +439,9 @@ def get_all_actors():
 
 
 def get_actor_by_id(actor_id):
+    if USE_SQLITE:
+        found = _sqlite_docs("SELECT doc FROM actors WHERE id = ?", (str(actor_id),))
+        return found[0] if found else None
     actors = load_actors()
     for a in actors:
         if str(a.get("id")) == str(actor_id):
@@ -172,6 +450,12 @@ def get_actor_by_id(actor_id):
 
 
 def get_actors_for_movie(movie_id):
+    if USE_SQLITE:
+        return _sqlite_docs(
+            "SELECT a.doc FROM actor_films f JOIN actors a ON a.id = f.actor_id"
+            " WHERE f.movie_id = ? ORDER BY a.rowid",
+            (movie_id,),
+        )
     actors = load_actors()
     return [a for a in actors if movie_id in a.get("films", [])]
 
@@ -180,7 +464,11 @@ def get_movies_for_actor(actor):
     movie_ids = actor.get("films", [])
     if not movie_ids:
         return []
-    movies = load_movies()
+    if USE_SQLITE:
+        placeholders = ",".join("?" * len(movie_ids))
+        movies = _sqlite_docs(f"SELECT doc FROM movies WHERE id IN ({placeholders})", movie_ids)
+    else:
+        movies = load_movies()
     # construction d'un dict pour opti la recherche
     movie_map = {m["id"]: m for m in movies}
     # renvoyer film correspondant à l'id
@@ -203,7 +491,8 @@ def require_admin(info):
         raise GraphQLError("missing X-User-Id header")
     base = os.environ.get("USER_URL", "http://localhost:3203")
     try:
-        resp = requests.get(f"{base}/users/{user_id}/admin", timeout=3)
+        with DOWNSTREAM_DURATION.time("require_admin"):
+            resp = requests.get(f"{base}/users/{user_id}/admin", timeout=3)
     except requests.RequestException:
         raise GraphQLError("user service unreachable")
     if resp.status_code != 200:
@@ -213,9 +502,14 @@ def require_admin(info):
         raise GraphQLError("admin only")
     
 def movie_already_exists(title, director):
-    movies = load_movies()
     t = title.strip().lower()
     d = director.strip().lower()
+    if USE_SQLITE:
+        return sqlite_conn().execute(
+            "SELECT 1 FROM movies WHERE lower(trim(title)) = ? AND lower(trim(director)) = ? LIMIT 1",
+            (t, d),
+        ).fetchone() is not None
+    movies = load_movies()
     for m in movies:
         if (
             # vérifie si le film existe
@@ -239,6 +533,11 @@ def resolve_movie(_,info,  id):
     return get_movie_by_id(id)
 
 
+@query.field("moviesByIds")
+def resolve_movies_by_ids(_, info, ids):
+    return get_movies_by_ids(ids)
+
+
 @query.field("actors")
 def resolve_actors(_, info):
     return get_all_actors()
@@ -263,20 +562,23 @@ def resolve_actors_by_movie(_,info,  movieId):
 
 
 @query.field("topRatedMovies")
-def resolve_top_rated_movies(_,info,  limit_film):
-    movies = load_movies()
-    movies_sorted = sorted(
-        movies,
-        key=lambda m: m.get("rating", 0.0),
-        reverse=True,
-    )
+def resolve_top_rated_movies(_,info,  limit):
     #permet de retourner les x 1er films
     try:
-        n = int(limit_film)
+        n = int(limit)
     except (TypeError, ValueError):
         n = 0
     if n <= 0:
         return []
+    if USE_SQLITE:
+        # index movies_rating : pas de tri complet
+        return _sqlite_docs("SELECT doc FROM movies ORDER BY rating DESC, rowid LIMIT ?", (n,))
+    movies = load_movies()
+    movies_sorted = sorted(
+        movies,
+        key=lambda m: m.get("rating", 0.0),
+        reverse=True,
+    )
     return movies_sorted[:n]
 
 
@@ -302,6 +604,42 @@ def resolve_actor_films(actor, info):
     return movies
 
 
+# ---------- Notification du service schedule ----------
+
+# un seul thread : les notifications partent dans l'ordre des modifications
+_notifier = futures.ThreadPoolExecutor(max_workers=1)
+_schedule_stub = None
+
+
+def _send_movies_changed(movies, deleted_ids):
+    global _schedule_stub
+    if _schedule_stub is None:
+        _schedule_stub = schedule_pb2_grpc.ScheduleStub(grpc.insecure_channel(SCHEDULE_ADDR))
+    request = schedule_pb2.MoviesChangedRequest(
+        movies=[
+            schedule_pb2.Movie(
+                id=str(m.get("id")),
+                title=str(m.get("title") or ""),
+                director=str(m.get("director") or ""),
+                rating=float(m.get("rating") or 0.0),
+            )
+            for m in movies
+        ],
+        deleted_ids=deleted_ids,
+    )
+    try:
+        _schedule_stub.NotifyMoviesChanged(request, timeout=3)
+    except grpc.RpcError:
+        # best effort : schedule relira les notes à l'expiration de son cache
+        pass
+
+
+def notify_schedule(movies=(), deleted_ids=()):
+    """Prévient le service schedule (en arrière-plan) que des films ont changé."""
+    if SCHEDULE_ADDR:
+        _notifier.submit(_send_movies_changed, list(movies), [str(i) for i in deleted_ids])
+
+
 # ---------- Mutations ----------
 
 #il n’y a pas de field parent, car ce resolver est appelé directement depuis la requête (objet racine _)
@@ -318,7 +656,9 @@ def resolve_create_movie(_, info, input):
     if movie_already_exists(title, director):
         raise GraphQLError("movie with same title and director already exists")
 
-    return create_movie(title=title, director=director, rating=rating)
+    created = create_movie(title=title, director=director, rating=rating)
+    notify_schedule(movies=[created])
+    return created
 
 
 
@@ -332,6 +672,7 @@ def resolve_update_movie(_, info, id, input):
     updated = update_movie(id, title=title, director=director, rating=rating)
     if updated is None:
         raise GraphQLError("movie ID not found")
+    notify_schedule(movies=[updated])
     return updated
 
 
@@ -341,6 +682,7 @@ def resolve_update_movie_rating(_, info, id, rating):
     updated = update_movie_rating(id, rating)
     if updated is None:
         raise GraphQLError("movie ID not found")
+    notify_schedule(movies=[updated])
     return updated
 
 
@@ -350,6 +692,7 @@ def resolve_delete_movie(_, info, id):
     deleted = delete_movie(id)
     if deleted is None:
         raise GraphQLError("movie ID not found")
+    notify_schedule(deleted_ids=[id])
     return deleted
 
 
@@ -363,6 +706,7 @@ def resolve_delete_movie_safe(_, info, id):
     deleted = delete_movie(id)
     if deleted is None:
         raise GraphQLError("movie ID not found")
+    notify_schedule(deleted_ids=[id])
     return deleted
 
 
@@ -370,23 +714,22 @@ def resolve_delete_movie_safe(_, info, id):
 def resolve_add_film_to_actor(_, info, actorId, movieId):
     require_admin(info)
 
-    actors = load_actors()
-    movies = load_movies()
-
-    movie = next((m for m in movies if m["id"] == movieId), None)
+    movie = get_movie_by_id(movieId)
     if movie is None:
         raise GraphQLError("movie ID not found")
 
-    actor = next((a for a in actors if a["id"] == actorId), None)
-    if actor is None:
-        raise GraphQLError("actor ID not found")
+    # l'acteur lu est celui du cache JSON : lu, modifié et sauvegardé sous le même verrou
+    with _json_lock:
+        actor = get_actor_by_id(actorId)
+        if actor is None:
+            raise GraphQLError("actor ID not found")
 
-    films = actor.get("films", [])
-    if movieId not in films:
-        films.append(movieId)
-    actor["films"] = films
+        films = actor.get("films", [])
+        if movieId not in films:
+            films.append(movieId)
+        actor["films"] = films
 
-    save_actors(actors)
+        save_actor(actor)
     return actor
 
 
@@ -394,26 +737,24 @@ def resolve_add_film_to_actor(_, info, actorId, movieId):
 def resolve_remove_film_from_actor(_, info, actorId, movieId):
     require_admin(info)
 
-    actors = load_actors()
-    movies = load_movies()
-
-    movie = next((m for m in movies if m["id"] == movieId), None)
+    movie = get_movie_by_id(movieId)
     if movie is None:
         raise GraphQLError("movie ID not found")
 
-    actor = next((a for a in actors if a["id"] == actorId), None)
-    if actor is None:
-        raise GraphQLError("actor ID not found")
+    with _json_lock:
+        actor = get_actor_by_id(actorId)
+        if actor is None:
+            raise GraphQLError("actor ID not found")
 
-    films = actor.get("films", [])
+        films = actor.get("films", [])
 
-    if movieId not in films:
-        raise GraphQLError("actor is not associated with this movie")
+        if movieId not in films:
+            raise GraphQLError("actor is not associated with this movie")
 
-    films.remove(movieId)
-    actor["films"] = films
+        films.remove(movieId)
+        actor["films"] = films
 
-    save_actors(actors)
+        save_actor(actor)
     return actor
 
 
@@ -421,16 +762,13 @@ def resolve_remove_film_from_actor(_, info, actorId, movieId):
 def resolve_create_actor(_, info, id, firstname, lastname, birthyear, films):
     require_admin(info)
 
-    actors = load_actors()
-    movies = load_movies()
-
-    if any(a["id"] == id for a in actors):
+    if get_actor_by_id(id) is not None:
         raise GraphQLError("actor ID already exists")
 
-    #any= au moins un
     #vérifie que chaque film associé à l’acteur existe réellement
+    known = {m["id"] for m in get_movies_for_actor({"films": films})}
     for film_id in films:
-        if not any(m["id"] == film_id for m in movies):
+        if film_id not in known:
             raise GraphQLError(f"movie '{film_id}' does not exist")
 
     new_actor = {
@@ -441,8 +779,7 @@ def resolve_create_actor(_, info, id, firstname, lastname, birthyear, films):
         "films": films,
     }
 
-    actors.append(new_actor)
-    save_actors(actors)
+    save_actor(new_actor)
     return new_actor
 
 
@@ -450,18 +787,14 @@ def resolve_create_actor(_, info, id, firstname, lastname, birthyear, films):
 def resolve_delete_actor(_, info, id):
     require_admin(info)
 
-    actors = load_actors()
-
-    # recherche le 1er acteur dans la liste dont l’ID == id
-    actor = next((a for a in actors if a["id"] == id), None)
+    actor = get_actor_by_id(id)
     if actor is None:
         raise GraphQLError("actor ID not found")
 
     if actor.get("films", []):
         raise GraphQLError("cannot delete actor: films are still associated")
 
-    actors.remove(actor)
-    save_actors(actors)
+    remove_actor(id)
     return actor
 
 
@@ -0,0 +1,25 @@
+-- Schéma SQLite du service movie (STORAGE=sqlite), lu aussi par import_to_mongo.py --backend sqlite
+CREATE TABLE IF NOT EXISTS movies (
+  id TEXT PRIMARY KEY,
+  title TEXT NOT NULL,
+  director TEXT NOT NULL,
+  rating REAL NOT NULL DEFAULT 0,
+  doc TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS movies_title ON movies(lower(title));
+CREATE INDEX IF NOT EXISTS movies_director ON movies(lower(director));
+CREATE INDEX IF NOT EXISTS movies_rating ON movies(rating DESC);
+CREATE TABLE IF NOT EXISTS actors (
+  id TEXT PRIMARY KEY,
+  firstname TEXT,
+  lastname TEXT,
+  birthyear INTEGER,
+  doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actor_films (
+  actor_id TEXT NOT NULL,
+  movie_id TEXT NOT NULL,
+  position INTEGER NOT NULL,
+  PRIMARY KEY (actor_id, movie_id)
+);
+CREATE INDEX IF NOT EXISTS actor_films_movie ON actor_films(movie_id);
@@ -1,19 +1,73 @@
+import asyncio
+import atexit
+import bisect
 import json
 import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
 import requests
-from typing import List, Dict
+from typing import List, Dict, Optional
 from concurrent import futures
 
 import grpc
 from google.protobuf import empty_pb2
 
+try:
+    # client HTTP asynchrone pour le mode GRPC_MODE=aio (sinon requests dans un thread)
+    import httpx
+except ImportError:
+    httpx = None
+
+# modules communs aux services (datawatch, ...) : dossier common/ du dépôt, copié dans /app par le Dockerfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
 import schedule_pb2
 import schedule_pb2_grpc
+from datawatch import watcher, write_json_atomic
+from schedule_journal import (
+    file_signature, journal_header, journal_is_stale, journal_lines, read_journal, replay_journal,
+)
+import metrics
+from metrics import (
+    CACHE_REQUESTS, DOWNSTREAM_DURATION, GRPC_DURATION, GRPC_REQUESTS, STORAGE_DURATION, cache_lookup, timed,
+)
 
 PORT = 3202
 DATABASE_PATH = "./data/times.json"
+# mode JSON : modifications ajoutées à ce journal, intégré à times.json toutes les JOURNAL_MAX_ENTRIES lignes
+JOURNAL_PATH = os.environ.get("JOURNAL_PATH", DATABASE_PATH + ".journal")
+JOURNAL_MAX_ENTRIES = int(os.environ.get("JOURNAL_MAX_ENTRIES", "200"))
+# threads = grpc.server + ThreadPoolExecutor ; aio = grpc.aio (méthodes async, appels HTTP non bloquants)
+GRPC_MODE = os.environ.get("GRPC_MODE", "threads").lower()
+GRPC_MAX_WORKERS = int(os.environ.get("GRPC_MAX_WORKERS", "10"))
+# mode threads : flux WatchSchedule simultanés, chacun sur un thread ajouté au pool
+# (les GRPC_MAX_WORKERS threads restent aux autres RPC) ; au-delà : RESOURCE_EXHAUSTED
+WATCH_MAX_STREAMS = int(os.environ.get("WATCH_MAX_STREAMS", "32"))
+# GET /metrics (format Prometheus) sur ce port ; 0 = pas de serveur de métriques
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9202"))
+# limites de concurrence (vide = pas de limite)
+MAX_CONCURRENT_RPCS = int(os.environ["MAX_CONCURRENT_RPCS"]) if os.environ.get("MAX_CONCURRENT_RPCS") else None
+MAX_CONCURRENT_STREAMS = int(os.environ["MAX_CONCURRENT_STREAMS"]) if os.environ.get("MAX_CONCURRENT_STREAMS") else None
+# durée (s) pendant laquelle le meilleur film d'une date est réutilisé sans redemander les notes
+BEST_RATED_TTL = float(os.environ.get("BEST_RATED_TTL", "30"))
+# > 0 : les écritures faites pendant cette fenêtre (ms) sont regroupées en une seule, après la réponse
+WRITE_BEHIND_MS = float(os.environ.get("WRITE_BEHIND_MS", "0"))
+# nombre de modifications gardées pour WatchSchedule (au-delà : le client reçoit un instantané)
+WATCH_HISTORY = int(os.environ.get("WATCH_HISTORY", "1000"))
+# VALIDATE_MOVIES=false : CreateSchedule / UpdateSchedule acceptent des ids de films inconnus
+VALIDATE_MOVIES = os.environ.get("VALIDATE_MOVIES", "true").lower() == "true"
 
-USE_MONGO = os.environ.get("USE_MONGO", "false").lower() == "true"
+# STORAGE = json | mongo | sqlite (USE_MONGO=true reste équivalent à STORAGE=mongo)
+STORAGE = os.environ.get("STORAGE", "").lower() or (
+    "mongo" if os.environ.get("USE_MONGO", "false").lower() == "true" else "json"
+)
+USE_MONGO = STORAGE == "mongo"
+USE_SQLITE = STORAGE == "sqlite"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "./data/schedule.db")
 MONGO_URL = os.environ.get("MONGO_URL", "")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "appdb")
 _mongo_db = None
@@ -25,21 +79,96 @@ if USE_MONGO:
         _mongo_db = None
 
 
+# schéma partagé avec import_to_mongo.py --backend sqlite
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql"), encoding="utf-8") as _schema:
+    SQLITE_SCHEMA = _schema.read()
+
+_sqlite_local = threading.local()
+
+
+def sqlite_conn():
+    # une connexion par thread ; en WAL les lecteurs ne bloquent pas l'écrivain
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _sqlite_local.conn = conn
+    return conn
+
+
+@contextmanager
+def sqlite_transaction():
+    # BEGIN IMMEDIATE : prend le verrou d'écriture tout de suite (pas de lecture périmée)
+    conn = sqlite_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _sqlite_put_date(conn, date: str, movies: List[str]):
+    conn.execute("INSERT OR IGNORE INTO schedule (date) VALUES (?)", (date,))
+    conn.execute("DELETE FROM schedule_movies WHERE date = ?", (date,))
+    conn.executemany(
+        "INSERT INTO schedule_movies (date, position, movie_id) VALUES (?, ?, ?)",
+        [(date, i, m) for i, m in enumerate(movies)],
+    )
+
+
+def _sqlite_delete_date(conn, date: str):
+    conn.execute("DELETE FROM schedule_movies WHERE date = ?", (date,))
+    conn.execute("DELETE FROM schedule WHERE date = ?", (date,))
 
+
+def init_sqlite():
+    sqlite_conn().executescript(SQLITE_SCHEMA)
+    # premier démarrage : on importe le JSON (une seule fois)
+    with sqlite_transaction() as conn:
+        if conn.execute("SELECT 1 FROM schedule LIMIT 1").fetchone() is None and os.path.exists(DATABASE_PATH):
+            with open(DATABASE_PATH, "r", encoding="utf-8") as jsf:
+                for e in json.load(jsf)["schedule"]:
+                    _sqlite_put_date(conn, e["date"], e.get("movies", []))
+
+
+@timed(STORAGE_DURATION, "load_schedule")
 def load_schedule() -> List[Dict]:
+    if USE_SQLITE:
+        os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
+        init_sqlite()
+        entries: Dict[str, Dict] = {}
+        rows = sqlite_conn().execute(
+            "SELECT s.date, m.movie_id FROM schedule s"
+            " LEFT JOIN schedule_movies m ON m.date = s.date"
+            " ORDER BY s.rowid, m.position"
+        )
+        for date, movie_id in rows:
+            entry = entries.setdefault(date, {"date": date, "movies": []})
+            if movie_id is not None:
+                entry["movies"].append(movie_id)
+        return list(entries.values())
     if USE_MONGO and _mongo_db is not None:
         try:
             return list(_mongo_db.schedule.find({}, {"_id": 0}))
         except Exception:
             return []
-    try:
-        with open(DATABASE_PATH, "r", encoding="utf-8") as jsf:
-            return json.load(jsf)["schedule"]
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    # au démarrage le journal est intégré au fichier, qui redevient complet
+    compact_journal()
+    return _read_json_file()
 
 
+@timed(STORAGE_DURATION, "save_schedule")
 def save_schedule(schedule_data: List[Dict]):
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            conn.execute("DELETE FROM schedule_movies")
+            conn.execute("DELETE FROM schedule")
+            for e in schedule_data:
+                _sqlite_put_date(conn, e["date"], e.get("movies", []))
+        return
     if USE_MONGO and _mongo_db is not None:
         try:
             _mongo_db.schedule.delete_many({})
@@ -48,18 +177,203 @@ def save_schedule(schedule_data: List[Dict]):
             return
         except Exception:
             pass
-    os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
-    data = {"schedule": schedule_data}
-    with open(DATABASE_PATH, "w", encoding="utf-8") as jsf:
-        json.dump(data, jsf, indent=2)
+    with _journal_lock:
+        _write_json_file(schedule_data)
+        _clear_journal()
+
+
+@timed(STORAGE_DURATION, "save_schedule_dates")
+def save_schedule_dates(changes: Dict[str, Optional[Dict]]):
+    """Persiste plusieurs dates en une seule écriture (entrée None -> suppression).
+
+    SQLite : une transaction ; Mongo : un bulk_write d'upserts / suppressions par date ;
+    JSON : des lignes ajoutées au journal, intégré au fichier toutes les JOURNAL_MAX_ENTRIES lignes.
+    """
+    if not changes:
+        return
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            for date, entry in changes.items():
+                if entry is None:
+                    _sqlite_delete_date(conn, date)
+                else:
+                    _sqlite_put_date(conn, date, entry.get("movies", []))
+        return
+    if USE_MONGO and _mongo_db is not None:
+        try:
+            from pymongo import DeleteOne, ReplaceOne
+            _mongo_db.schedule.bulk_write([
+                DeleteOne({"date": date}) if entry is None
+                else ReplaceOne({"date": date}, {"date": date, "movies": list(entry.get("movies", []))}, upsert=True)
+                for date, entry in changes.items()
+            ], ordered=True)
+            return
+        except Exception:
+            pass
+    _append_journal(changes)
+
+
+def save_schedule_date(date: str, entry: Optional[Dict]):
+    """Persiste la modification d'une seule date (entry=None -> suppression)."""
+    save_schedule_dates({date: entry})
+
+
+# ---------- JSON : fichier complet + journal des modifications ----------
+
+_journal_lock = threading.Lock()
+_journal_entries = 0
+
+
+def _read_json_file() -> List[Dict]:
+    try:
+        with open(DATABASE_PATH, "r", encoding="utf-8") as jsf:
+            return json.load(jsf)["schedule"]
+    except (FileNotFoundError, json.JSONDecodeError):
+        return []
+
+
+def _write_json_file(schedule_data: List[Dict]):
+    # fichier temporaire puis os.replace : times.json est toujours complet
+    write_json_atomic(DATABASE_PATH, {"schedule": schedule_data})
+    watcher.written(DATABASE_PATH)
+
+
+def _read_journal() -> Optional[List[Dict]]:
+    # None : times.json remplacé hors du service depuis le début du journal (voir schedule_journal)
+    return read_journal(JOURNAL_PATH, DATABASE_PATH)
+
+
+def _clear_journal():
+    global _journal_entries
+    if os.path.exists(JOURNAL_PATH):
+        os.remove(JOURNAL_PATH)
+    _journal_entries = 0
+
+
+def _append_journal(changes: Dict[str, Optional[Dict]]):
+    global _journal_entries
+    lines = journal_lines(changes)
+    with _journal_lock:
+        os.makedirs(os.path.dirname(JOURNAL_PATH) or ".", exist_ok=True)
+        if journal_is_stale(JOURNAL_PATH, DATABASE_PATH):
+            # journal d'avant un remplacement externe de times.json : abandonné
+            _clear_journal()
+        with open(JOURNAL_PATH, "a", encoding="utf-8") as jf:
+            if jf.tell() == 0:
+                # nouveau journal : il s'applique à la version actuelle de times.json
+                jf.write(journal_header(DATABASE_PATH))
+            jf.write(lines)
+            jf.flush()
+            os.fsync(jf.fileno())
+        _journal_entries += len(changes)
+        if _journal_entries >= JOURNAL_MAX_ENTRIES:
+            _compact_locked()
+
+
+def _compact_locked():
+    records = _read_journal()
+    if records:
+        _write_json_file(replay_journal(_read_json_file(), records))
+    _clear_journal()
+
+
+def compact_journal():
+    """Intègre le journal à times.json (écriture atomique) puis le vide."""
+    with _journal_lock:
+        _compact_locked()
+
+
+def read_schedule_snapshot() -> Optional[List[Dict]]:
+    """times.json et son journal lus au même instant ; None si le fichier est illisible.
+
+    Le fichier est parsé hors de _journal_lock, puis on vérifie sous le verrou qu'il n'a
+    pas été réécrit entre-temps (intégration du journal) : sinon on recommence. Un journal
+    qui ne correspond plus au fichier est supprimé.
+    """
+    while True:
+        base = file_signature(DATABASE_PATH)
+        try:
+            with open(DATABASE_PATH, "r", encoding="utf-8") as jsf:
+                schedule_data = json.load(jsf)["schedule"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # fichier en cours d'écriture : datawatch verra la version suivante
+            return None
+        with _journal_lock:
+            if file_signature(DATABASE_PATH) != base:
+                continue
+            records = _read_journal()
+            if records is None:
+                _clear_journal()
+                records = []
+        return replay_journal(schedule_data, records)
+
+
+class WriteBehind:
+    """Regroupe les écritures faites pendant WRITE_BEHIND_MS en une seule (write-behind).
+
+    Les RPC n'attendent plus le disque. Une écriture en échec est retentée à la
+    fenêtre suivante ; à l'arrêt du service (SIGTERM, fin normale) ce qui reste est
+    écrit. Seul un arrêt brutal (SIGKILL, panne) peut perdre la dernière fenêtre.
+    """
+
+    def __init__(self, window: float, lookup):
+        self.window = window
+        # lecture de l'état courant d'une date au moment de l'écriture
+        self.lookup = lookup
+        self.pending = set()
+        self._cond = threading.Condition()
+        # une écriture à la fois : celle de l'arrêt ne croise pas celle du thread
+        self._flush_lock = threading.Lock()
+        threading.Thread(target=self.run, name="schedule-write-behind", daemon=True).start()
+        # arrêt du service : on écrit ce qui reste
+        atexit.register(self.close)
+
+    def submit(self, date: str):
+        with self._cond:
+            self.pending.add(date)
+            self._cond.notify()
+
+    def flush(self) -> bool:
+        """Écrit les dates en attente ; en cas d'échec elles restent en attente (renvoie False)."""
+        with self._flush_lock:
+            with self._cond:
+                dates, self.pending = self.pending, set()
+            if not dates:
+                return True
+            try:
+                save_schedule_dates({date: self.lookup(date) for date in sorted(dates)})
+                return True
+            except Exception as e:
+                print(f"write-behind: failed to save {len(dates)} dates, will retry: {e}")
+                with self._cond:
+                    self.pending |= dates
+                return False
+
+    def close(self):
+        if not self.flush():
+            print(f"write-behind: {len(self.pending)} dates NOT saved at shutdown: {sorted(self.pending)}")
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.pending)
+            time.sleep(self.window)
+            self.flush()
+
+
+def grpc_server_options():
+    options = []
+    if MAX_CONCURRENT_STREAMS:
+        # streams HTTP/2 simultanés par connexion client
+        options.append(("grpc.max_concurrent_streams", MAX_CONCURRENT_STREAMS))
+    return options
 
 
 def validate_date_format(date: str) -> bool:
     return len(date) == 8 and date.isdigit()
 
 
-def get_movie(movie_id: str):
-    query = """
+MOVIE_QUERY = """
     query($id: ID!) {
       movie(id: $id) {
         id
@@ -69,12 +383,45 @@ def get_movie(movie_id: str):
       }
     }
     """
+
+MOVIES_INFO_QUERY = """
+    query($ids: [ID!]!) {
+      moviesByIds(ids: $ids) {
+        id
+        title
+        director
+        rating
+      }
+    }
+    """
+
+
+def movie_url() -> str:
+    return os.environ.get("MOVIE_URL", "http://localhost:3001/graphql")
+
+
+def parse_movies_info(payload: Dict) -> Dict[str, Dict]:
+    infos = {}
+    for m in (payload.get("data") or {}).get("moviesByIds") or []:
+        try:
+            infos[str(m["id"])] = {
+                "title": str(m.get("title") or ""),
+                "director": str(m.get("director") or ""),
+                "rating": float(m.get("rating")),
+            }
+        except (KeyError, TypeError, ValueError):
+            continue
+    return infos
+
+
+def get_movie(movie_id: str):
     try:
-        r = requests.post(
-            os.environ.get("MOVIE_URL", "http://localhost:3001/graphql"),
-            json={"query": query, "variables": {"id": movie_id}},
-            timeout=3,
-        )
+        with DOWNSTREAM_DURATION.time("get_movie"):
+            r = requests.post(
+                movie_url(),
+                json={"query": MOVIE_QUERY, "variables": {"id": movie_id}},
+                timeout=3,
+            )
     except requests.RequestException:
         return None
 
@@ -85,12 +432,324 @@ def get_movie(movie_id: str):
     return payload.get("data", {}).get("movie")
 
 
+def get_movies_info(movie_ids: List[str]) -> Optional[Dict[str, Dict]]:
+    """Titre, réalisateur et note de tous les films demandés en une seule requête.
+
+    Renvoie None si le service Movie est injoignable ; les films inconnus ou sans
+    note valide sont absents du dict.
+    """
+    try:
+        with DOWNSTREAM_DURATION.time("get_movies_info"):
+            r = requests.post(
+                movie_url(),
+                json={"query": MOVIES_INFO_QUERY, "variables": {"ids": list(dict.fromkeys(movie_ids))}},
+                timeout=3,
+            )
+    except requests.RequestException:
+        return None
+
+    if r.status_code != 200:
+        return None
+
+    return parse_movies_info(r.json())
+
+
+# Journal des modifications (WatchSchedule)
+
+class ChangeFeed:
+    """Dernières modifications du planning, numérotées par une version croissante."""
+
+    def __init__(self, max_events: int = WATCH_HISTORY):
+        # départ à l'heure courante (ms) : après un redémarrage, une ancienne version
+        # de client ne peut pas coïncider avec la nouvelle numérotation
+        self.version = int(time.time() * 1000)
+        # (version, type, date, films)
+        self.events = deque(maxlen=max_events)
+        self._cond = threading.Condition()
+        # abonnés asyncio : (boucle, asyncio.Event) réveillés à chaque modification
+        self._async_waiters = set()
+
+    def publish(self, change_type: int, date: str, movies: List[str]):
+        with self._cond:
+            self.version += 1
+            self.events.append((self.version, change_type, date, list(movies)))
+            self._cond.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def since(self, version: int) -> Optional[List[tuple]]:
+        """Modifications postérieures à version, ou None si elles ne sont plus dans le journal."""
+        with self._cond:
+            if version > self.version:
+                # version inconnue (serveur redémarré) : le client doit repartir d'un instantané
+                return None
+            if version == self.version:
+                return []
+            oldest = self.events[0][0] if self.events else self.version + 1
+            if version < oldest - 1:
+                return None
+            # versions consécutives : position directe dans le journal
+            return list(self.events)[version - oldest + 1:]
+
+    def wait(self, version: int, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.version != version, timeout)
+
+    def subscribe(self, loop, event):
+        with self._cond:
+            self._async_waiters.add((loop, event))
+
+    def unsubscribe(self, loop, event):
+        with self._cond:
+            self._async_waiters.discard((loop, event))
+
+
+def change_message(event: tuple):
+    version, change_type, date, movies = event
+    return schedule_pb2.ScheduleChange(
+        version=version,
+        type=change_type,
+        entry=schedule_pb2.ScheduleEntry(date=date, movies=movies),
+    )
+
 
 # Implémentation du service gRPC
 
 class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
     def __init__(self):
-        self.schedule = load_schedule()
+        # date -> entrée (ordre d'insertion conservé = ordre du fichier)
+        self.schedule: Dict[str, Dict] = {}
+        # dates triées, pour les parcours ordonnés
+        self.dates: List[str] = []
+        # index inverse : id de film -> dates triées où il est programmé
+        self.movie_dates: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+        # catalogue local des films : id -> (titre/réalisateur/note ou None si inconnu, date de lecture)
+        self._catalog: Dict[str, tuple] = {}
+        # date -> (films de la date, expiration, classement [(id, note)] du mieux noté au moins bien noté)
+        self._ranked: Dict[str, tuple] = {}
+        # recalcul des classements après CreateSchedule / UpdateSchedule, hors des requêtes
+        self._refresher = futures.ThreadPoolExecutor(max_workers=1)
+        self._persist_lock = threading.Lock()
+        # places pour les flux WatchSchedule du serveur à threads (voir WATCH_MAX_STREAMS)
+        self._watch_slots = threading.BoundedSemaphore(WATCH_MAX_STREAMS) if WATCH_MAX_STREAMS > 0 else None
+        self._writer = WriteBehind(WRITE_BEHIND_MS / 1000, lambda date: self.schedule.get(date)) if WRITE_BEHIND_MS > 0 else None
+        for e in load_schedule():
+            if e.get("date") not in self.schedule:
+                self._put(e)
+        # modifications faites après le chargement (pas d'événements pour le fichier initial)
+        self.changes = ChangeFeed()
+        if STORAGE == "json":
+            # times.json modifié hors du service (bind mount) : planning rechargé sans redémarrer
+            watcher.watch(DATABASE_PATH, "schedule", self.reload)
+
+    def _put(self, entry: Dict):
+        date = entry["date"]
+        old = self.schedule.get(date)
+        if old is None:
+            bisect.insort(self.dates, date)
+        else:
+            self._unindex_movies(old)
+        self.schedule[date] = entry
+        for movie_id in set(entry.get("movies", [])):
+            bisect.insort(self.movie_dates.setdefault(movie_id, []), date)
+
+    def _remove(self, date: str) -> Optional[Dict]:
+        entry = self.schedule.pop(date, None)
+        if entry is not None:
+            del self.dates[bisect.bisect_left(self.dates, date)]
+            self._unindex_movies(entry)
+        return entry
+
+    def _unindex_movies(self, entry: Dict):
+        date = entry["date"]
+        for movie_id in set(entry.get("movies", [])):
+            dates = self.movie_dates.get(movie_id)
+            if not dates:
+                continue
+            i = bisect.bisect_left(dates, date)
+            if i < len(dates) and dates[i] == date:
+                del dates[i]
+            if not dates:
+                del self.movie_dates[movie_id]
+
+    def reload(self, _loaded: Optional[List[Dict]] = None):
+        """Remplace le planning par times.json relu (appelé par le thread de datawatch).
+
+        datawatch ne sert que de déclencheur : tout se passe sous _persist_lock. Les dates
+        en attente du write-behind sont d'abord écrites, puis times.json est relu avec son
+        journal au même instant (read_schedule_snapshot) : aucune écriture ne passe entre
+        la lecture et l'échange. Les écritures attendent pendant ce rechargement, qui ne
+        suit qu'une modification externe du fichier.
+        Le fichier ayant été remplacé hors du service, le journal ne le concerne plus
+        en général : il est alors supprimé au lieu d'être réappliqué (voir schedule_journal).
+        """
+        with self._persist_lock:
+            if self._writer is not None and not self._writer.flush():
+                print("reload: pending schedule writes could not be saved, times.json not reloaded")
+                return
+            loaded = read_schedule_snapshot()
+            if loaded is None:
+                return
+            self._swap(loaded)
+
+    def _swap(self, loaded: List[Dict]):
+        # construction à côté puis échange d'un coup (sous _persist_lock)
+        schedule: Dict[str, Dict] = {}
+        for e in loaded:
+            schedule.setdefault(e["date"], {"date": e["date"], "movies": list(e.get("movies", []))})
+        dates = sorted(schedule)
+        movie_dates: Dict[str, List[str]] = {}
+        for date in dates:
+            for movie_id in set(schedule[date]["movies"]):
+                movie_dates.setdefault(movie_id, []).append(date)
+
+        Change = schedule_pb2.ScheduleChange
+        with self._lock:
+            old = self.schedule
+            self.schedule, self.dates, self.movie_dates = schedule, dates, movie_dates
+            # les abonnés de WatchSchedule reçoivent les différences
+            for date, entry in old.items():
+                if date not in schedule:
+                    self._ranked.pop(date, None)
+                    self.changes.publish(Change.DELETED, date, entry.get("movies", []))
+            for date, entry in schedule.items():
+                before = old.get(date)
+                if before is None or before.get("movies", []) != entry["movies"]:
+                    self._ranked.pop(date, None)
+                    self.changes.publish(Change.CREATED if before is None else Change.UPDATED, date, entry["movies"])
+                    self._refresher.submit(self._refresh_ranking, date)
+
+    def write_date(self, date: str, entry: Optional[Dict], context, exists: bool) -> Dict:
+        """Enregistre la nouvelle entrée de la date (None -> suppression), puis l'applique en mémoire et la publie.
+
+        Les écritures passent une à une sous _persist_lock : le stockage suit l'ordre de la mémoire.
+        Si l'écriture échoue, ni la mémoire ni les abonnés de WatchSchedule n'ont vu la modification.
+        exists : la date doit exister (mise à jour, suppression) ou non (création), vérifié sous le verrou.
+        Avec le write-behind, l'écriture a lieu après la réponse : la date est appliquée puis mise en file.
+        Renvoie l'ancienne entrée.
+        """
+        Change = schedule_pb2.ScheduleChange
+        with self._persist_lock:
+            old = self.schedule.get(date)
+            if exists and old is None:
+                context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"Schedule not found for date: {date}"
+                )
+            if not exists and old is not None:
+                context.abort(
+                    grpc.StatusCode.ALREADY_EXISTS,
+                    f"Schedule already exists for date: {date}"
+                )
+            if self._writer is None:
+                try:
+                    save_schedule_date(date, entry)
+                except Exception:
+                    context.abort(
+                        grpc.StatusCode.INTERNAL,
+                        "Failed to save schedule"
+                    )
+            with self._lock:
+                if entry is None:
+                    self._remove(date)
+                    self._ranked.pop(date, None)
+                    self.changes.publish(Change.DELETED, date, old.get("movies", []))
+                else:
+                    self._put(entry)
+                    self.changes.publish(Change.CREATED if old is None else Change.UPDATED, date, entry["movies"])
+                    self._refresher.submit(self._refresh_ranking, date)
+        if self._writer is not None:
+            self._writer.submit(date)
+        return old
+
+    def dates_between(self, from_date: str = "", to_date: str = "") -> List[str]:
+        # recherche dichotomique dans les dates triées : O(log n + k)
+        lo = bisect.bisect_left(self.dates, from_date) if from_date else 0
+        hi = bisect.bisect_right(self.dates, to_date) if to_date else len(self.dates)
+        return self.dates[lo:hi]
+
+    def movie_dates_between(self, movie_id: str, from_date: str = "", to_date: str = "") -> List[str]:
+        dates = self.movie_dates.get(movie_id, [])
+        lo = bisect.bisect_left(dates, from_date) if from_date else 0
+        hi = bisect.bisect_right(dates, to_date) if to_date else len(dates)
+        return dates[lo:hi]
+
+    def _range_dates(self, request, context) -> List[str]:
+        for bound in (request.from_date, request.to_date):
+            if bound and not validate_date_format(bound):
+                context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "Invalid date format. Use YYYYMMDD"
+                )
+        if request.from_date and request.to_date and request.from_date > request.to_date:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                "from_date must not be after to_date"
+            )
+        return self.dates_between(request.from_date, request.to_date)
+
+    # "quand ce film passe-t-il ?" sans récupérer tout le planning
+    def GetDatesForMovie(self, request, context):
+        if not request.movie_id.strip():
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                "movie_id is required"
+            )
+        for bound in (request.from_date, request.to_date):
+            if bound and not validate_date_format(bound):
+                context.abort(
+                    grpc.StatusCode.INVALID_ARGUMENT,
+                    "Invalid date format. Use YYYYMMDD"
+                )
+        return schedule_pb2.MovieDatesResponse(
+            movie_id=request.movie_id,
+            dates=self.movie_dates_between(request.movie_id, request.from_date, request.to_date)
+        )
+
+    def watch_batch(self, version: int):
+        """Messages à envoyer à un client arrivé à version, et la version atteinte ensuite."""
+        events = self.changes.since(version) if version > 0 else None
+        if events is not None:
+            return [change_message(ev) for ev in events], (events[-1][0] if events else version)
+
+        # instantané cohérent : aucune modification possible pendant la copie
+        with self._lock:
+            entries = [(e["date"], list(e.get("movies", []))) for e in self.schedule.values()]
+            current = self.changes.version
+        messages = [
+            change_message((current, schedule_pb2.ScheduleChange.SNAPSHOT, date, movies))
+            for date, movies in entries
+        ]
+        messages.append(schedule_pb2.ScheduleChange(
+            version=current, type=schedule_pb2.ScheduleChange.SNAPSHOT_END
+        ))
+        return messages, current
+
+    # flux : instantané ou rattrapage depuis from_version, puis chaque modification
+    def WatchSchedule(self, request, context):
+        if request.from_version < 0:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                "from_version must be >= 0"
+            )
+        # chaque flux garde un thread : au-delà des places réservées, il prendrait ceux des RPC unaires
+        if self._watch_slots is None or not self._watch_slots.acquire(blocking=False):
+            context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                f"Too many WatchSchedule streams (WATCH_MAX_STREAMS={WATCH_MAX_STREAMS}), use GRPC_MODE=aio"
+            )
+        try:
+            version = request.from_version
+            while context.is_active():
+                messages, version = self.watch_batch(version)
+                for message in messages:
+                    yield message
+                # réveil régulier pour remarquer un client parti
+                self.changes.wait(version, timeout=1.0)
+        finally:
+            self._watch_slots.release()
 
     # GET /showmovies
     def GetAllSchedules(self, request, context):
@@ -102,10 +761,32 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 #optionnel avec get
                 movies=e.get("movies", [])
             )
-            for e in self.schedule
+            for e in self.schedule.values()
         ]
         return schedule_pb2.ListSchedulesResponse(schedules=entries)
 
+    # envoie les dates une par une (pas de gros message unique)
+    def StreamSchedules(self, request, context):
+        for date in self._range_dates(request, context):
+            e = self.schedule.get(date)
+            if e is None:  # supprimée entre-temps
+                continue
+            yield schedule_pb2.ScheduleEntry(
+                date=e["date"],
+                movies=e.get("movies", [])
+            )
+
+    def GetSchedulesInRange(self, request, context):
+        entries = []
+        for date in self._range_dates(request, context):
+            e = self.schedule.get(date)
+            if e is not None:
+                entries.append(schedule_pb2.ScheduleEntry(
+                    date=e["date"],
+                    movies=e.get("movies", [])
+                ))
+        return schedule_pb2.ListSchedulesResponse(schedules=entries)
+
     # GET /showmovies/<date>
     def GetScheduleByDate(self, request, context):
         # récupération de la date depuis la requête
@@ -117,18 +798,34 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 "Invalid date format. Use YYYYMMDD"
             )
 
-        for e in self.schedule:
-            if e.get("date") == date: #optionnel
-                return schedule_pb2.ScheduleEntry(
-                    date=e["date"], #obligatoire
-                    movies=e.get("movies", [])
-                )
+        e = self.schedule.get(date)
+        if e is not None:
+            return schedule_pb2.ScheduleEntry(
+                date=e["date"], #obligatoire
+                movies=e.get("movies", [])
+            )
 
         context.abort(
             grpc.StatusCode.NOT_FOUND,
             f"Schedule not found for date: {date}"
         )
 
+    def GetSchedulesByDates(self, request, context):
+        response = schedule_pb2.SchedulesByDatesResponse()
+        for date in request.dates:
+            result = response.results[date]
+            if not validate_date_format(date):
+                result.error = "Invalid date format. Use YYYYMMDD"
+                continue
+            e = self.schedule.get(date)
+            if e is None:
+                result.error = f"Schedule not found for date: {date}"
+                continue
+            result.found = True
+            result.entry.date = e["date"]
+            result.entry.movies.extend(e.get("movies", []))
+        return response
+
     # POST /showmovies/<date>
     def CreateSchedule(self, request, context):
         date = request.date
@@ -140,12 +837,11 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 "Invalid date format. Use YYYYMMDD"
             )
 
-        for e in self.schedule:
-            if e.get("date") == date:
-                context.abort(
-                    grpc.StatusCode.ALREADY_EXISTS,
-                    f"Schedule already exists for date: {date}"
-                )
+        if date in self.schedule:
+            context.abort(
+                grpc.StatusCode.ALREADY_EXISTS,
+                f"Schedule already exists for date: {date}"
+            )
 
         if not isinstance(movies, list):
             context.abort(
@@ -160,15 +856,9 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                     "All movie entries must be non-empty strings"
                 )
 
-        new_entry = {"date": date, "movies": movies}
-        self.schedule.append(new_entry)
-        try:
-            save_schedule(self.schedule)
-        except Exception:
-            context.abort(
-                grpc.StatusCode.INTERNAL,
-                "Failed to save schedule"
-            )
+        self.validate_movies(movies, context)
+
+        self.write_date(date, {"date": date, "movies": movies}, context, exists=False)
 
         return schedule_pb2.ScheduleEntry(
             date=date,
@@ -199,27 +889,15 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                     "All movie entries must be non-empty strings"
                 )
 
-        for i, e in enumerate(self.schedule):
-            if e.get("date") == date:
-                #self.schedule= 
-                #MAJ des films de cette date
-                self.schedule[i]["movies"] = movies
-                try:
-                    save_schedule(self.schedule)
-                except Exception:
-                    context.abort(
-                        grpc.StatusCode.INTERNAL,
-                        "Failed to save schedule"
-                    )
+        if date in self.schedule:
+            self.validate_movies(movies, context)
 
-                return schedule_pb2.ScheduleEntry(
-                    date=date,
-                    movies=movies
-                )
+        #MAJ des films de cette date (et de l'index film -> dates)
+        self.write_date(date, {"date": date, "movies": movies}, context, exists=True)
 
-        context.abort(
-            grpc.StatusCode.NOT_FOUND,
-            f"Schedule not found for date: {date}"
+        return schedule_pb2.ScheduleEntry(
+            date=date,
+            movies=movies
         )
 
     # DELETE /showmovies/<date>
@@ -232,30 +910,16 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 "Invalid date format. Use YYYYMMDD"
             )
 
-        for i, e in enumerate(self.schedule):
-            if e.get("date") == date:
-                deleted = self.schedule.pop(i)
-                try:
-                    save_schedule(self.schedule)
-                except Exception:
-                    context.abort(
-                        grpc.StatusCode.INTERNAL,
-                        "Failed to save schedule"
-                    )
-
-                deleted_msg = schedule_pb2.ScheduleEntry(
-                    date=deleted["date"],
-                    movies=deleted.get("movies", [])
-                )
-                return schedule_pb2.DeleteScheduleResponse(
-                    success=True,
-                    message=f"Schedule deleted for date: {date}",
-                    deleted_entry=deleted_msg
-                )
+        deleted = self.write_date(date, None, context, exists=True)
 
-        context.abort(
-            grpc.StatusCode.NOT_FOUND,
-            f"Schedule not found for date: {date}"
+        deleted_msg = schedule_pb2.ScheduleEntry(
+            date=deleted["date"],
+            movies=deleted.get("movies", [])
+        )
+        return schedule_pb2.DeleteScheduleResponse(
+            success=True,
+            message=f"Schedule deleted for date: {date}",
+            deleted_entry=deleted_msg
         )
 
     # Présentation Johanne
@@ -264,6 +928,43 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
     #self = instance de la classe -> permet d'accéder aux objects
     #context -> utiliser pour les erreurs
     def GetBestRatedMovie(self, request, context):
+        movies_today, ranking = self.ranking(request, context)
+        return self.best_rated_response(request.date, movies_today, ranking)
+
+    def GetTopRatedForDate(self, request, context):
+        self.check_top_k(request, context)
+        movies_today, ranking = self.ranking(request, context)
+        return self.top_rated_response(request, movies_today, ranking)
+
+    # le service movie signale les films créés / modifiés / supprimés
+    def NotifyMoviesChanged(self, request, context):
+        now = time.monotonic()
+        changed = set()
+        with self._lock:
+            for m in request.movies:
+                self._catalog[m.id] = ({"title": m.title, "director": m.director, "rating": m.rating}, now)
+                changed.add(m.id)
+            for movie_id in request.deleted_ids:
+                self._catalog[movie_id] = (None, now)
+                changed.add(movie_id)
+            # seules les dates où ces films sont programmés sont reclassées
+            dates = {d for movie_id in changed for d in self.movie_dates.get(movie_id, [])}
+            for date in dates:
+                self._rank_date(date, self.schedule[date].get("movies", []))
+        return empty_pb2.Empty()
+
+    def ranking(self, request, context):
+        """Films de la date et leur classement, en ne relisant que les films pas à jour."""
+        movies_today, ranking, to_fetch = self.ranking_prepare(request, context)
+        if ranking is None:
+            infos = get_movies_info(to_fetch) if to_fetch else {}
+            ranking = self.ranking_finish(request.date, movies_today, to_fetch, infos)
+        return movies_today, ranking
+
+    # Étapes sans I/O réseau, partagées avec le serveur asyncio
+
+    def ranking_prepare(self, request, context):
+        """Validation ; renvoie (films de la date, classement prêt ou None, films à relire)."""
         date = request.date
 
         if not validate_date_format(date):
@@ -272,11 +973,8 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 "Invalid date format. Use YYYYMMDD"
             )
 
-        day_entry = None
-        for e in self.schedule:#self.schedule= liste chargé avec tout le json times
-            if e.get("date") == date:
-                day_entry = e #stocke l'entrée avec date et movie
-                break
+        #self.schedule= dict date -> entrée avec date et movie
+        day_entry = self.schedule.get(date)
 
         if day_entry is None:
             context.abort(
@@ -285,7 +983,122 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
             )
 
         movies_today = day_entry.get("movies", [])
+        if len(movies_today) == 0:
+            return movies_today, [], []
+
+        # classement valable tant que la liste des films n'a pas changé et que les notes sont fraîches
+        cached = self._ranked.get(date)
+        if cached is not None and cached[0] == tuple(movies_today) and cached[1] > time.monotonic():
+            cache_lookup("ranking", True)
+            return movies_today, cached[2], []
+        cache_lookup("ranking", False)
+
+        return movies_today, None, self.stale_movies(movies_today)
+
+    def ranking_finish(self, date, movies_today, to_fetch, infos):
+        """Enregistre les films relus (infos None = service Movie injoignable) et classe la date."""
+        with self._lock:
+            self._remember_movies(to_fetch, infos)
+            return self._rank_date(date, movies_today)
+
+    def _remember_movies(self, movie_ids: List[str], infos: Optional[Dict[str, Dict]]):
+        # appelé sous self._lock ; un id absent de la réponse est noté inconnu (None)
+        if infos is None:
+            return
+        now = time.monotonic()
+        for movie_id in movie_ids:
+            self._catalog[movie_id] = (infos.get(movie_id), now)
+
+    def validate_movies(self, movies: List[str], context):
+        """Vérifie que tous les films existent, en une seule requête pour les films pas à jour.
+
+        Si le service Movie est injoignable, le catalogue local (même ancien) fait foi ;
+        un film jamais vu ne peut alors pas être vérifié.
+        """
+        if not VALIDATE_MOVIES or not movies:
+            return
+        to_fetch = self.stale_movies(movies)
+        if to_fetch:
+            infos = get_movies_info(to_fetch)
+            with self._lock:
+                self._remember_movies(to_fetch, infos)
+
+        unknown = []
+        unchecked = []
+        for movie_id in dict.fromkeys(movies):
+            known = self._catalog.get(movie_id)
+            if known is None:
+                unchecked.append(movie_id)
+            elif known[0] is None:
+                unknown.append(movie_id)
+        if unknown:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"Unknown movie ids: {unknown}"
+            )
+        if unchecked:
+            context.abort(
+                grpc.StatusCode.UNAVAILABLE,
+                f"Movie service unreachable, cannot check movie ids: {unchecked}"
+            )
 
+    def stale_movies(self, movie_ids: List[str]) -> List[str]:
+        now = time.monotonic()
+        stale = []
+        for movie_id in dict.fromkeys(movie_ids):
+            known = self._catalog.get(movie_id)
+            if known is None or known[1] + BEST_RATED_TTL <= now:
+                stale.append(movie_id)
+        # un film frais = une note lue sans appeler le service Movie
+        fresh = len(set(movie_ids)) - len(stale)
+        if fresh:
+            CACHE_REQUESTS.inc("movie_catalog", "hit", amount=fresh)
+        if stale:
+            CACHE_REQUESTS.inc("movie_catalog", "miss", amount=len(stale))
+        return stale
+
+    def _rank_date(self, date: str, movies_today: List[str]) -> List[tuple]:
+        """Classe les films de la date d'après le catalogue (appelé sous self._lock).
+
+        Le classement n'est gardé que si tous les films sont connus du catalogue ;
+        il expire avec la plus ancienne des notes utilisées.
+        """
+        ranking = []
+        read_at = []
+        for movie_id in dict.fromkeys(movies_today):
+            known = self._catalog.get(movie_id)
+            if known is None:
+                continue
+            read_at.append(known[1])
+            if known[0] is not None:
+                ranking.append((movie_id, known[0]["rating"]))
+        # tri stable : à note égale, le premier film de la date reste devant
+        ranking.sort(key=lambda r: r[1], reverse=True)
+        if len(read_at) == len(set(movies_today)):
+            self._ranked[date] = (tuple(movies_today), min(read_at) + BEST_RATED_TTL, ranking)
+        return ranking
+
+    def _refresh_ranking(self, date: str):
+        """Recalcule le classement d'une date modifiée, hors du chemin de la requête."""
+        entry = self.schedule.get(date)
+        if entry is None:
+            return
+        movies_today = entry.get("movies", [])
+        to_fetch = self.stale_movies(movies_today)
+        infos = get_movies_info(to_fetch) if to_fetch else {}
+        self.ranking_finish(date, movies_today, to_fetch, infos)
+
+    def movie_message(self, movie_id: str, rating: float):
+        known = self._catalog.get(movie_id)
+        info = (known[0] if known is not None else None) or {}
+        return schedule_pb2.Movie(
+            id=movie_id,
+            title=info.get("title", ""),
+            rating=rating,
+            director=info.get("director", "")
+        )
+
+    def best_rated_response(self, date, movies_today, ranking):
         if len(movies_today) == 0:
             return schedule_pb2.BestRatedResponse(
                 date=date,
@@ -294,25 +1107,7 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 message="no movies scheduled for this date"
             )
 
-        best_movie_json = None
-        best_rating = -1.0
-
-        for movie_id in movies_today:
-            info = get_movie(movie_id)
-            if info is None:
-                continue
-
-            rating = info.get("rating")
-            try:
-                rating_val = float(rating)
-            except (TypeError, ValueError):
-                continue
-
-            if rating_val > best_rating:
-                best_rating = rating_val
-                best_movie_json = info
-
-        if best_movie_json is None:
+        if not ranking:
             return schedule_pb2.BestRatedResponse(
                 date=date,
                 movie=schedule_pb2.Movie(),
@@ -320,23 +1115,306 @@ class ScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
                 message="no valid movie info found for this date"
             )
 
-        movie_msg = schedule_pb2.Movie(
-            id=str(best_movie_json.get("id", "")),
-            title=str(best_movie_json.get("title", "")),
-            rating=float(best_movie_json.get("rating", 0.0)),
-            director=str(best_movie_json.get("director", ""))
-        )
-
+        best_id, best_rating = ranking[0]
         return schedule_pb2.BestRatedResponse(
             date=date,
-            movie=movie_msg,
+            movie=self.movie_message(best_id, best_rating),
             rating=best_rating,
             message=""
         )
 
+    def check_top_k(self, request, context):
+        if request.k < 0:
+            context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                "k must be >= 0"
+            )
+
+    def top_rated_response(self, request, movies_today, ranking):
+        top = ranking[:request.k] if request.k > 0 else ranking
+        message = ""
+        if len(movies_today) == 0:
+            message = "no movies scheduled for this date"
+        elif not ranking:
+            message = "no valid movie info found for this date"
+        return schedule_pb2.TopRatedResponse(
+            date=request.date,
+            movies=[self.movie_message(movie_id, rating) for movie_id, rating in top],
+            message=message
+        )
+
+
+# ---------- Serveur asyncio (GRPC_MODE=aio) ----------
+
+class _Aborted(Exception):
+    def __init__(self, code, details):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class _SyncContext:
+    """Contexte donné au code synchrone : abort() lève _Aborted au lieu d'une coroutine."""
+
+    def __init__(self, context):
+        self._context = context
+
+    def abort(self, code, details):
+        raise _Aborted(code, details)
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+_http_client = None
+
+
+def _async_http():
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=3)
+    return _http_client
+
+
+async def _post_movie_graphql(query: str, variables: Dict, call: str) -> Optional[Dict]:
+    if httpx is None:
+        # pas de httpx : requests dans le pool de threads par défaut
+        def post():
+            try:
+                with DOWNSTREAM_DURATION.time(call):
+                    r = requests.post(movie_url(), json={"query": query, "variables": variables}, timeout=3)
+            except requests.RequestException:
+                return None
+            return r.json() if r.status_code == 200 else None
+        return await asyncio.to_thread(post)
+    try:
+        with DOWNSTREAM_DURATION.time(call):
+            r = await _async_http().post(movie_url(), json={"query": query, "variables": variables})
+    except httpx.HTTPError:
+        return None
+    return r.json() if r.status_code == 200 else None
+
+
+async def get_movies_info_async(movie_ids: List[str]) -> Optional[Dict[str, Dict]]:
+    payload = await _post_movie_graphql(MOVIES_INFO_QUERY, {"ids": list(dict.fromkeys(movie_ids))}, "get_movies_info")
+    return None if payload is None else parse_movies_info(payload)
+
+
+class AioScheduleServicer(schedule_pb2_grpc.ScheduleServicer):
+    """Même service, méthodes async : aucun thread bloqué pendant les appels sortants.
+
+    Les lectures en mémoire sont exécutées directement dans la boucle d'événements,
+    les écritures (fichier / Mongo / SQLite) dans un thread.
+    """
+
+    def __init__(self, core: Optional[ScheduleServicer] = None):
+        self.core = core or ScheduleServicer()
+
+    async def _run(self, method, request, context, blocking=False):
+        sync_context = _SyncContext(context)
+        try:
+            if blocking:
+                return await asyncio.to_thread(method, request, sync_context)
+            return method(request, sync_context)
+        except _Aborted as e:
+            await context.abort(e.code, e.details)
+
+    async def GetAllSchedules(self, request, context):
+        return await self._run(self.core.GetAllSchedules, request, context)
+
+    async def GetScheduleByDate(self, request, context):
+        return await self._run(self.core.GetScheduleByDate, request, context)
+
+    async def GetSchedulesByDates(self, request, context):
+        return await self._run(self.core.GetSchedulesByDates, request, context)
+
+    async def GetSchedulesInRange(self, request, context):
+        return await self._run(self.core.GetSchedulesInRange, request, context)
+
+    async def GetDatesForMovie(self, request, context):
+        return await self._run(self.core.GetDatesForMovie, request, context)
+
+    async def WatchSchedule(self, request, context):
+        if request.from_version < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "from_version must be >= 0")
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        self.core.changes.subscribe(loop, changed)
+        try:
+            version = request.from_version
+            while True:
+                changed.clear()
+                messages, version = self.core.watch_batch(version)
+                for message in messages:
+                    yield message
+                if self.core.changes.version == version:
+                    await changed.wait()
+        finally:
+            self.core.changes.unsubscribe(loop, changed)
+
+    async def CreateSchedule(self, request, context):
+        return await self._run(self.core.CreateSchedule, request, context, blocking=True)
+
+    async def UpdateSchedule(self, request, context):
+        return await self._run(self.core.UpdateSchedule, request, context, blocking=True)
+
+    async def DeleteSchedule(self, request, context):
+        return await self._run(self.core.DeleteSchedule, request, context, blocking=True)
+
+    async def StreamSchedules(self, request, context):
+        dates = await self._run(self.core._range_dates, request, context)
+        for date in dates:
+            e = self.core.schedule.get(date)
+            if e is None:
+                continue
+            yield schedule_pb2.ScheduleEntry(date=e["date"], movies=e.get("movies", []))
+
+    async def _ranking(self, request, context):
+        movies_today, ranking, to_fetch = await self._run(self.core.ranking_prepare, request, context)
+        if ranking is None:
+            infos = await get_movies_info_async(to_fetch) if to_fetch else {}
+            ranking = self.core.ranking_finish(request.date, movies_today, to_fetch, infos)
+        return movies_today, ranking
+
+    async def GetBestRatedMovie(self, request, context):
+        movies_today, ranking = await self._ranking(request, context)
+        return self.core.best_rated_response(request.date, movies_today, ranking)
+
+    async def GetTopRatedForDate(self, request, context):
+        await self._run(self.core.check_top_k, request, context)
+        movies_today, ranking = await self._ranking(request, context)
+        return self.core.top_rated_response(request, movies_today, ranking)
+
+    async def NotifyMoviesChanged(self, request, context):
+        return await self._run(self.core.NotifyMoviesChanged, request, context)
+
+
+# ---------- Métriques : un intercepteur par mode de serveur ----------
+
+def _observe_rpc(method, context, start, default_code):
+    # code posé par abort()/set_code(), sinon OK, UNKNOWN (exception) ou CANCELLED (client parti)
+    code = context.code() or default_code
+    GRPC_REQUESTS.inc(method, getattr(code, "name", str(code)))
+    GRPC_DURATION.observe(time.perf_counter() - start, method)
+
+
+class MetricsInterceptor(grpc.ServerInterceptor):
+    """Nombre d'appels par méthode et code de retour, et durée (flux entier pour WatchSchedule)."""
+
+    def intercept_service(self, continuation, handler_call_details):
+        handler = continuation(handler_call_details)
+        if handler is None or not metrics.METRICS_ENABLED:
+            return handler
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+
+        if handler.unary_unary is not None:
+            inner = handler.unary_unary
+
+            def unary_unary(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    response = inner(request, context)
+                    code = grpc.StatusCode.OK
+                    return response
+                finally:
+                    _observe_rpc(method, context, start, code)
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary, handler.request_deserializer, handler.response_serializer)
+
+        if handler.unary_stream is not None:
+            inner = handler.unary_stream
+
+            def unary_stream(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    yield from inner(request, context)
+                    code = grpc.StatusCode.OK
+                except GeneratorExit:
+                    code = grpc.StatusCode.CANCELLED
+                    raise
+                finally:
+                    _observe_rpc(method, context, start, code)
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream, handler.request_deserializer, handler.response_serializer)
+        return handler
+
+
+class AioMetricsInterceptor(grpc.aio.ServerInterceptor):
+    """Même mesure pour le serveur asyncio."""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        handler = await continuation(handler_call_details)
+        if handler is None or not metrics.METRICS_ENABLED:
+            return handler
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+
+        if handler.unary_unary is not None:
+            inner = handler.unary_unary
+
+            async def unary_unary(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    response = await inner(request, context)
+                    code = grpc.StatusCode.OK
+                    return response
+                except asyncio.CancelledError:
+                    code = grpc.StatusCode.CANCELLED
+                    raise
+                finally:
+                    _observe_rpc(method, context, start, code)
+            return grpc.unary_unary_rpc_method_handler(
+                unary_unary, handler.request_deserializer, handler.response_serializer)
+
+        if handler.unary_stream is not None:
+            inner = handler.unary_stream
+
+            async def unary_stream(request, context):
+                start = time.perf_counter()
+                code = grpc.StatusCode.UNKNOWN
+                try:
+                    async for message in inner(request, context):
+                        yield message
+                    code = grpc.StatusCode.OK
+                except (asyncio.CancelledError, GeneratorExit):
+                    code = grpc.StatusCode.CANCELLED
+                    raise
+                finally:
+                    _observe_rpc(method, context, start, code)
+            return grpc.unary_stream_rpc_method_handler(
+                unary_stream, handler.request_deserializer, handler.response_serializer)
+        return handler
+
+
+async def serve_aio():
+    metrics.serve(METRICS_PORT)
+    server = grpc.aio.server(
+        interceptors=[AioMetricsInterceptor()],
+        options=grpc_server_options(),
+        maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS,
+    )
+    schedule_pb2_grpc.add_ScheduleServicer_to_server(AioScheduleServicer(), server)
+    server.add_insecure_port(f"[::]:{PORT}")
+    await server.start()
+    print(f"gRPC Schedule server (asyncio) running on port {PORT}")
+    await server.wait_for_termination()
+
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    if GRPC_MODE == "aio":
+        asyncio.run(serve_aio())
+        return
+
+    metrics.serve(METRICS_PORT)
+    server = grpc.server(
+        # threads en plus pour les flux WatchSchedule, qui occupent chacun un thread
+        futures.ThreadPoolExecutor(max_workers=GRPC_MAX_WORKERS + max(WATCH_MAX_STREAMS, 0)),
+        interceptors=[MetricsInterceptor()],
+        options=grpc_server_options(),
+        maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS,
+    )
     schedule_pb2_grpc.add_ScheduleServicer_to_server(ScheduleServicer(), server)
     #une connexion avec l’hôte et utilisons ce channel pour créer le stub
     server.add_insecure_port(f"[::]:{PORT}")
@@ -346,4 +1424,6 @@ def serve():
 
 
 if __name__ == "__main__":
+    # docker stop (SIGTERM) : sortie normale pour que atexit écrive les modifications en attente (WRITE_BEHIND_MS)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     serve()
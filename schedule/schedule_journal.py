@@ -0,0 +1,88 @@
+"""Journal des modifications du planning en mode JSON (times.json + times.json.journal).
+
+Lu par le service schedule et par import_to_mongo.py : une seule définition du format.
+
+La première ligne du journal note la signature de times.json au moment où le
+journal a été commencé. Si times.json a été remplacé depuis hors du service
+(export_from_mongo.py, édition à la main, ...), le journal ne correspond plus à
+ce fichier et il est ignoré au lieu d'être réappliqué par-dessus.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+
+def file_signature(path) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+
+def journal_header(data_path) -> str:
+    return json.dumps({"base": file_signature(data_path)}) + "\n"
+
+
+def journal_lines(changes: Dict[str, Optional[Dict]]) -> str:
+    return "".join(
+        json.dumps({"date": date, "deleted": True} if entry is None
+                   else {"date": date, "movies": list(entry.get("movies", []))}) + "\n"
+        for date, entry in changes.items()
+    )
+
+
+def journal_is_stale(journal_path, data_path) -> bool:
+    """Vrai si le journal a été commencé sur une autre version de data_path (ne lit que l'en-tête)."""
+    try:
+        with open(journal_path, "r", encoding="utf-8") as jf:
+            first = jf.readline()
+    except FileNotFoundError:
+        return False
+    try:
+        header = json.loads(first)
+    except json.JSONDecodeError:
+        return False
+    return "base" in header and header["base"] != file_signature(data_path)
+
+
+def read_journal(journal_path, data_path) -> Optional[List[Dict]]:
+    """Lignes du journal à appliquer à data_path ; None si le journal ne correspond plus au fichier."""
+    records = []
+    try:
+        with open(journal_path, "r", encoding="utf-8") as jf:
+            for i, line in enumerate(jf):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # dernière ligne incomplète (arrêt pendant l'écriture) : ignorée
+                    break
+                if i == 0 and "base" in record:
+                    if record["base"] != file_signature(data_path):
+                        return None
+                    continue
+                records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def journal_entry(record: Dict) -> Optional[Dict]:
+    """Entrée du planning décrite par une ligne du journal ; None pour une suppression."""
+    if record.get("deleted"):
+        return None
+    return {"date": record["date"], "movies": record.get("movies", [])}
+
+
+def replay_journal(schedule_data: List[Dict], records: List[Dict]) -> List[Dict]:
+    """Applique les lignes du journal à la liste des dates du fichier."""
+    entries = {}
+    for e in schedule_data:
+        entries.setdefault(e["date"], e)
+    for rec in records:
+        entry = journal_entry(rec)
+        if entry is None:
+            entries.pop(rec["date"], None)
+        else:
+            entries[rec["date"]] = entry
+    return list(entries.values())
@@ -73,6 +73,41 @@ class ScheduleStub(object):
                 request_serializer=schedule__pb2.DateRequest.SerializeToString,
                 response_deserializer=schedule__pb2.BestRatedResponse.FromString,
                 _registered_method=True)
+        self.GetTopRatedForDate = channel.unary_unary(
+                '/schedule.Schedule/GetTopRatedForDate',
+                request_serializer=schedule__pb2.TopRatedRequest.SerializeToString,
+                response_deserializer=schedule__pb2.TopRatedResponse.FromString,
+                _registered_method=True)
+        self.NotifyMoviesChanged = channel.unary_unary(
+                '/schedule.Schedule/NotifyMoviesChanged',
+                request_serializer=schedule__pb2.MoviesChangedRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                _registered_method=True)
+        self.StreamSchedules = channel.unary_stream(
+                '/schedule.Schedule/StreamSchedules',
+                request_serializer=schedule__pb2.RangeRequest.SerializeToString,
+                response_deserializer=schedule__pb2.ScheduleEntry.FromString,
+                _registered_method=True)
+        self.GetSchedulesInRange = channel.unary_unary(
+                '/schedule.Schedule/GetSchedulesInRange',
+                request_serializer=schedule__pb2.RangeRequest.SerializeToString,
+                response_deserializer=schedule__pb2.ListSchedulesResponse.FromString,
+                _registered_method=True)
+        self.GetSchedulesByDates = channel.unary_unary(
+                '/schedule.Schedule/GetSchedulesByDates',
+                request_serializer=schedule__pb2.DatesRequest.SerializeToString,
+                response_deserializer=schedule__pb2.SchedulesByDatesResponse.FromString,
+                _registered_method=True)
+        self.GetDatesForMovie = channel.unary_unary(
+                '/schedule.Schedule/GetDatesForMovie',
+                request_serializer=schedule__pb2.MovieDatesRequest.SerializeToString,
+                response_deserializer=schedule__pb2.MovieDatesResponse.FromString,
+                _registered_method=True)
+        self.WatchSchedule = channel.unary_stream(
+                '/schedule.Schedule/WatchSchedule',
+                request_serializer=schedule__pb2.WatchRequest.SerializeToString,
+                response_deserializer=schedule__pb2.ScheduleChange.FromString,
+                _registered_method=True)
 
 
 class ScheduleServicer(object):
@@ -114,6 +149,54 @@ class ScheduleServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetTopRatedForDate(self, request, context):
+        """les k films les mieux notés de la date (k = 0 : tous), du mieux noté au moins bien noté
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def NotifyMoviesChanged(self, request, context):
+        """envoyé par le service movie quand des films sont créés, modifiés ou supprimés
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamSchedules(self, request, context):
+        """dates comprises entre from_date et to_date (inclus), dans l'ordre chronologique
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetSchedulesInRange(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetSchedulesByDates(self, request, context):
+        """plusieurs dates en un seul appel ; une date absente ne fait pas échouer l'appel
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetDatesForMovie(self, request, context):
+        """dates (triées) où un film est programmé, éventuellement entre deux bornes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchSchedule(self, request, context):
+        """flux des modifications du planning à partir d'une version (0 = instantané complet d'abord)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ScheduleServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -147,6 +230,41 @@ def add_ScheduleServicer_to_server(servicer, server):
                     request_deserializer=schedule__pb2.DateRequest.FromString,
                     response_serializer=schedule__pb2.BestRatedResponse.SerializeToString,
             ),
+            'GetTopRatedForDate': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTopRatedForDate,
+                    request_deserializer=schedule__pb2.TopRatedRequest.FromString,
+                    response_serializer=schedule__pb2.TopRatedResponse.SerializeToString,
+            ),
+            'NotifyMoviesChanged': grpc.unary_unary_rpc_method_handler(
+                    servicer.NotifyMoviesChanged,
+                    request_deserializer=schedule__pb2.MoviesChangedRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'StreamSchedules': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamSchedules,
+                    request_deserializer=schedule__pb2.RangeRequest.FromString,
+                    response_serializer=schedule__pb2.ScheduleEntry.SerializeToString,
+            ),
+            'GetSchedulesInRange': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSchedulesInRange,
+                    request_deserializer=schedule__pb2.RangeRequest.FromString,
+                    response_serializer=schedule__pb2.ListSchedulesResponse.SerializeToString,
+            ),
+            'GetSchedulesByDates': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetSchedulesByDates,
+                    request_deserializer=schedule__pb2.DatesRequest.FromString,
+                    response_serializer=schedule__pb2.SchedulesByDatesResponse.SerializeToString,
+            ),
+            'GetDatesForMovie': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetDatesForMovie,
+                    request_deserializer=schedule__pb2.MovieDatesRequest.FromString,
+                    response_serializer=schedule__pb2.MovieDatesResponse.SerializeToString,
+            ),
+            'WatchSchedule': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchSchedule,
+                    request_deserializer=schedule__pb2.WatchRequest.FromString,
+                    response_serializer=schedule__pb2.ScheduleChange.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'schedule.Schedule', rpc_method_handlers)
@@ -319,3 +437,192 @@ class Schedule(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetTopRatedForDate(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/schedule.Schedule/GetTopRatedForDate',
+            schedule__pb2.TopRatedRequest.SerializeToString,
+            schedule__pb2.TopRatedResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def NotifyMoviesChanged(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/schedule.Schedule/NotifyMoviesChanged',
+            schedule__pb2.MoviesChangedRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamSchedules(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/schedule.Schedule/StreamSchedules',
+            schedule__pb2.RangeRequest.SerializeToString,
+            schedule__pb2.ScheduleEntry.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetSchedulesInRange(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/schedule.Schedule/GetSchedulesInRange',
+            schedule__pb2.RangeRequest.SerializeToString,
+            schedule__pb2.ListSchedulesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetSchedulesByDates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/schedule.Schedule/GetSchedulesByDates',
+            schedule__pb2.DatesRequest.SerializeToString,
+            schedule__pb2.SchedulesByDatesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetDatesForMovie(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/schedule.Schedule/GetDatesForMovie',
+            schedule__pb2.MovieDatesRequest.SerializeToString,
+            schedule__pb2.MovieDatesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchSchedule(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/schedule.Schedule/WatchSchedule',
+            schedule__pb2.WatchRequest.SerializeToString,
+            schedule__pb2.ScheduleChange.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
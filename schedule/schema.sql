@@ -0,0 +1,11 @@
+-- Schéma SQLite du service schedule (STORAGE=sqlite), lu aussi par import_to_mongo.py --backend sqlite
+CREATE TABLE IF NOT EXISTS schedule (
+  date TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS schedule_movies (
+  date TEXT NOT NULL,
+  position INTEGER NOT NULL,
+  movie_id TEXT NOT NULL,
+  PRIMARY KEY (date, position)
+);
+CREATE INDEX IF NOT EXISTS schedule_movies_movie ON schedule_movies(movie_id);
@@ -130,7 +130,7 @@ def scenario_3_date_without_movies(stub):
 def scenario_4_all_movies_invalid_in_movie_service(stub):
     """
     CT4 : tous les IDs de films sont inconnus du service Movie
-    -> pas de film valide, message 'no valid movie info found for this date'
+    -> CreateSchedule refuse la date (INVALID_ARGUMENT), rien n'est créé
     """
     print("\n=== Scénario 4 : tous les films sont inconnus du service Movie ===")
     print_all_schedules(stub)
@@ -146,21 +146,24 @@ def scenario_4_all_movies_invalid_in_movie_service(stub):
 
     fake_movies = ["id-inconnu-1", "id-inconnu-2"]
 
-    stub.CreateSchedule(
-        schedule_pb2.CreateScheduleRequest(
-            date=test_date,
-            movies=fake_movies
+    try:
+        stub.CreateSchedule(
+            schedule_pb2.CreateScheduleRequest(
+                date=test_date,
+                movies=fake_movies
+            )
         )
-    )
-    ok(f"Schedule créé pour {test_date} avec uniquement des IDs inconnus")
-
-    resp = stub.GetBestRatedMovie(schedule_pb2.DateRequest(date=test_date))
-    print(f"  Réponse : date={resp.date}, rating={resp.rating}, message='{resp.message}'")
+        fail("CreateSchedule aurait dû refuser des IDs inconnus")
+    except grpc.RpcError as e:
+        print(f"  Erreur : {e.code()} - {e.details()}")
+        assert_equal(e.code(), grpc.StatusCode.INVALID_ARGUMENT,
+                     "IDs inconnus refusés à la création")
 
-    assert_equal(resp.date, test_date, "La date dans la réponse est correcte")
-    assert_equal(resp.rating, 0.0, "Rating = 0.0 quand aucun film n'est valide")
-    assert_equal(resp.message, "no valid movie info found for this date",
-                 "Message explicite quand aucun film n'est valide côté Movie")
+    try:
+        stub.GetBestRatedMovie(schedule_pb2.DateRequest(date=test_date))
+        fail("La date n'aurait pas dû être créée")
+    except grpc.RpcError as e:
+        assert_equal(e.code(), grpc.StatusCode.NOT_FOUND, "Aucun schedule créé pour la date")
 
     print_all_schedules(stub, "\n=== Après scénario 4 ===")
 
@@ -190,8 +193,8 @@ def scenario_6_mix_valid_and_invalid_movies(stub):
     """
     CT6 : mélange d'IDs valides et invalides.
     On vérifie que :
-      - les films inconnus sont ignorés
-      - on obtient quand même un film valide comme meilleur.
+      - CreateSchedule refuse la liste en citant seulement l'ID invalide
+      - la même date est acceptée avec le seul ID valide.
     ATTENTION : nécessite qu'au moins un ID choisi existe vraiment dans Movie.
     """
     print("\n=== Scénario 6 : mélange d'IDs valides et invalides ===")
@@ -210,13 +213,29 @@ def scenario_6_mix_valid_and_invalid_movies(stub):
     except grpc.RpcError:
         pass
 
+    try:
+        stub.CreateSchedule(
+            schedule_pb2.CreateScheduleRequest(
+                date=test_date,
+                movies=[valid_movie_id, invalid_movie_id]
+            )
+        )
+        fail("CreateSchedule aurait dû refuser l'ID invalide")
+    except grpc.RpcError as e:
+        print(f"  Erreur : {e.code()} - {e.details()}")
+        assert_equal(e.code(), grpc.StatusCode.INVALID_ARGUMENT, "ID invalide refusé")
+        if invalid_movie_id in e.details() and valid_movie_id not in e.details():
+            ok("Seul l'ID invalide est cité")
+        else:
+            fail("Le message devrait citer uniquement l'ID invalide")
+
     stub.CreateSchedule(
         schedule_pb2.CreateScheduleRequest(
             date=test_date,
-            movies=[valid_movie_id, invalid_movie_id]
+            movies=[valid_movie_id]
         )
     )
-    ok(f"Schedule créé pour {test_date} avec un film valide et un film invalide")
+    ok(f"Schedule créé pour {test_date} avec le film valide")
 
     best = stub.GetBestRatedMovie(schedule_pb2.DateRequest(date=test_date))
     print(
@@ -225,7 +244,7 @@ def scenario_6_mix_valid_and_invalid_movies(stub):
     )
 
     if best.movie.id == valid_movie_id:
-        ok("Le meilleur film retourné est bien l'ID valide (les invalides ont été ignorés)")
+        ok("Le meilleur film retourné est bien l'ID valide")
     else:
         fail("Le film retourné n'est pas l'ID valide attendu (vérifier les données Movie)")
 
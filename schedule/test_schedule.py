@@ -58,6 +58,11 @@ def main():
     else:
         ok("Test date correctly absent before test")
 
+    # version du planning avant les modifications (fin de l'instantané WatchSchedule)
+    watch = stub.WatchSchedule(schedule_pb2.WatchRequest(from_version=0))
+    start_version = next(c for c in watch if c.type == schedule_pb2.ScheduleChange.SNAPSHOT_END).version
+    watch.cancel()
+
     # -------- 2. CREATE SCHEDULE --------
     print("\n=== 2. CreateSchedule ===")
     created = stub.CreateSchedule(
@@ -81,6 +86,38 @@ def main():
     assert_equal(list(got.movies), initial_movies, "Fetched movies match created")
     print_all_schedules(stub, "\n=== After GetByDate ===")
 
+    # -------- 3b. RANGE QUERIES --------
+    print("\n=== 3b. GetSchedulesInRange / StreamSchedules ===")
+    range_req = schedule_pb2.RangeRequest(from_date="20151201", to_date=test_date)
+    in_range = stub.GetSchedulesInRange(range_req)
+    streamed = list(stub.StreamSchedules(range_req))
+    for e in streamed:
+        print_schedule_entry(e)
+    range_dates = [e.date for e in in_range.schedules]
+    assert_equal(range_dates, sorted(range_dates), "Range is sorted by date")
+    assert_equal(test_date in range_dates, True, "Range contains the created date")
+    assert_equal([e.date for e in streamed], range_dates, "Stream returns the same dates")
+
+    # -------- 3c. BATCH GET --------
+    print("\n=== 3c. GetSchedulesByDates ===")
+    batch = stub.GetSchedulesByDates(
+        schedule_pb2.DatesRequest(dates=[test_date, "20991231", "bad-date"])
+    )
+    for date, res in batch.results.items():
+        print(f"  - {date}: found={res.found}, movies={list(res.entry.movies)}, error='{res.error}'")
+    assert_equal(list(batch.results[test_date].entry.movies), initial_movies, "Batch returns the created date")
+    assert_equal(batch.results["20991231"].found, False, "Missing date reported as not found")
+    assert_equal(batch.results["bad-date"].found, False, "Invalid date reported as not found")
+
+    # -------- 3d. DATES FOR MOVIE --------
+    print("\n=== 3d. GetDatesForMovie ===")
+    movie_dates = stub.GetDatesForMovie(
+        schedule_pb2.MovieDatesRequest(movie_id=initial_movies[1])
+    )
+    print(f"  {initial_movies[1]} -> {list(movie_dates.dates)}")
+    assert_equal(test_date in movie_dates.dates, True, "Created date listed for the movie")
+    assert_equal(list(movie_dates.dates), sorted(movie_dates.dates), "Dates are sorted")
+
     # -------- 4. UPDATE --------
     print("\n=== 4. UpdateSchedule ===")
     updated = stub.UpdateSchedule(
@@ -92,6 +129,10 @@ def main():
     print("Updated schedule:")
     print_schedule_entry(updated)
     assert_equal(list(updated.movies), updated_movies, "Updated movies stored")
+    movie_dates = stub.GetDatesForMovie(
+        schedule_pb2.MovieDatesRequest(movie_id=initial_movies[1], from_date=test_date, to_date=test_date)
+    )
+    assert_equal(list(movie_dates.dates), [], "Reverse index updated after UpdateSchedule")
     print_all_schedules(stub, "\n=== After Update ===")
 
     # -------- 5. GET BEST RATED --------
@@ -104,6 +145,16 @@ def main():
             f"{best.movie.title} (id={best.movie.id}, rating={best.rating})"
         )
         ok("BestRatedMovie executed successfully")
+        top = stub.GetTopRatedForDate(schedule_pb2.TopRatedRequest(date=test_date2, k=3))
+        for m in top.movies:
+            print(f"  {m.title} (rating={m.rating})")
+        assert_equal(
+            [m.rating for m in top.movies],
+            sorted((m.rating for m in top.movies), reverse=True),
+            "TopRated sorted by rating"
+        )
+        if top.movies:
+            assert_equal(top.movies[0].id, best.movie.id, "TopRated starts with the best rated movie")
     except grpc.RpcError as e:
         fail(f"GetBestRatedMovie failed: {e.code()} - {e.details()}")
     print_all_schedules(stub, "\n=== After BestRatedMovie ===")
@@ -128,6 +179,23 @@ def main():
         else:
             fail(f"Unexpected error after delete: {e.code()}")
 
+    # -------- 8. WATCH (reprise depuis la version du début) --------
+    print("\n=== 8. WatchSchedule ===")
+    Change = schedule_pb2.ScheduleChange
+    watch = stub.WatchSchedule(schedule_pb2.WatchRequest(from_version=start_version))
+    changes = []
+    for c in watch:
+        print(f"  v{c.version} {Change.ChangeType.Name(c.type)} {c.entry.date}")
+        changes.append((c.type, c.entry.date))
+        if c.type == Change.DELETED and c.entry.date == test_date:
+            break
+    watch.cancel()
+    assert_equal(
+        [t for t, d in changes if d == test_date],
+        [Change.CREATED, Change.UPDATED, Change.DELETED],
+        "WatchSchedule replays create/update/delete"
+    )
+
     print_all_schedules(stub, "\n=== Final schedules ===")
 
     print("\n=== ✔ ALL TESTS COMPLETED ===")
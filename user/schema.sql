@@ -0,0 +1,16 @@
+-- Schéma SQLite du service user (STORAGE=sqlite), lu aussi par import_to_mongo.py --backend sqlite
+CREATE TABLE IF NOT EXISTS users (
+  id TEXT PRIMARY KEY,
+  name TEXT,
+  is_admin INTEGER NOT NULL DEFAULT 0,
+  last_active INTEGER,
+  doc TEXT NOT NULL,
+  version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS users_name ON users(name);
+CREATE TABLE IF NOT EXISTS users_meta (
+  id INTEGER PRIMARY KEY CHECK (id = 0),
+  version INTEGER NOT NULL
+);
+-- départ à l'heure courante (ms) : une base recréée ne redonne pas les ETag d'une ancienne
+INSERT OR IGNORE INTO users_meta (id, version) VALUES (0, CAST(strftime('%s', 'now') AS INTEGER) * 1000);
@@ -1,17 +1,37 @@
 from flask import Flask, render_template, request, jsonify, make_response
+import atexit
+import bisect
+import hashlib
 import json
 import os
+import signal
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 import time
 import uuid
 
+# modules communs aux services (datawatch, ...) : dossier common/ du dépôt, copié dans /app par le Dockerfile
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "common"))
+from datawatch import watcher, write_json_atomic
+from metrics import STORAGE_DURATION, cache_lookup, install_flask, timed
+
 
 app = Flask(__name__)
+install_flask(app)
 
 PORT = 3203
 HOST = '0.0.0.0'
 
-USE_MONGO = os.environ.get("USE_MONGO", "false").lower() == "true"
+# STORAGE = json | mongo | sqlite (USE_MONGO=true reste équivalent à STORAGE=mongo)
+STORAGE = os.environ.get("STORAGE", "").lower() or (
+    "mongo" if os.environ.get("USE_MONGO", "false").lower() == "true" else "json"
+)
+USE_MONGO = STORAGE == "mongo"
+USE_SQLITE = STORAGE == "sqlite"
+SQLITE_PATH = os.environ.get("SQLITE_PATH", "./data/user.db")
 MONGO_URL = os.environ.get("MONGO_URL", "")
 MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "appdb")
 _mongo_db = None
@@ -23,42 +43,479 @@ if USE_MONGO:
         _mongo_db = None
 
 USERS_PATH = '{}/data/users.json'.format(".")
-
+# nombre max d'ids dans POST /users/admin:batch
+MAX_BATCH_IDS = int(os.environ.get("MAX_BATCH_IDS", "10000"))
+# last_active : écritures regroupées toutes les LAST_ACTIVE_FLUSH secondes (0 = écriture immédiate)
+LAST_ACTIVE_FLUSH = float(os.environ.get("LAST_ACTIVE_FLUSH", "5"))
+# TRACK_ACTIVITY=true : chaque requête avec X-User-Id met à jour le last_active de l'appelant
+TRACK_ACTIVITY = os.environ.get("TRACK_ACTIVITY", "false").lower() == "true"
+# pagination de GET /users (?limit=&cursor=)
+DEFAULT_PAGE_SIZE = int(os.environ.get("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.environ.get("MAX_PAGE_SIZE", "1000"))
+
+@timed(STORAGE_DURATION, "load_users")
 def _load_users_from_json():
     with open(USERS_PATH, "r") as jsf:
         return json.load(jsf)["users"]
 
 def _save_users_to_json(users):
-    with open(USERS_PATH, 'w') as f:
-        json.dump({"users": users}, f, ensure_ascii=False, indent=2)
-
-if USE_MONGO and _mongo_db is not None:
+    write_json_atomic(USERS_PATH, {"users": users})
+    watcher.written(USERS_PATH)
+
+# ---------- SQLite (état partagé entre plusieurs workers) ----------
+
+# schéma partagé avec import_to_mongo.py --backend sqlite
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql"), encoding="utf-8") as _schema:
+    SQLITE_SCHEMA = _schema.read()
+
+_sqlite_local = threading.local()
+
+def sqlite_conn():
+    # une connexion par thread ; en WAL les lecteurs ne bloquent pas l'écrivain
+    conn = getattr(_sqlite_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(SQLITE_PATH, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _sqlite_local.conn = conn
+    return conn
+
+@contextmanager
+def sqlite_transaction():
+    # BEGIN IMMEDIATE : prend le verrou d'écriture tout de suite (pas de lecture périmée)
+    conn = sqlite_conn()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+def _user_row(user):
+    return (
+        str(user["id"]),
+        user.get("name"),
+        1 if user.get("is_admin") else 0,
+        user.get("last_active"),
+        json.dumps(user, ensure_ascii=False),
+    )
+
+def init_sqlite():
+    conn = sqlite_conn()
+    conn.executescript(SQLITE_SCHEMA)
+    # base créée avant les versions : ajout de la colonne
+    if "version" not in {col[1] for col in conn.execute("PRAGMA table_info(users)")}:
+        try:
+            conn.execute("ALTER TABLE users ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # ajoutée entre-temps par un autre worker
+    # premier démarrage : on importe le JSON (une seule fois, même avec N workers)
+    with sqlite_transaction() as conn:
+        empty = conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is None
+        if empty and os.path.exists(USERS_PATH):
+            version = _sqlite_bump(conn)
+            conn.executemany(
+                "INSERT OR IGNORE INTO users (id, name, is_admin, last_active, doc, version) VALUES (?, ?, ?, ?, ?, ?)",
+                [_user_row(u) + (version,) for u in _load_users_from_json()],
+            )
+
+def _sqlite_bump(conn):
+    """Nouvelle version de la collection (dans la transaction en cours)."""
+    conn.execute("UPDATE users_meta SET version = version + 1 WHERE id = 0")
+    return conn.execute("SELECT version FROM users_meta WHERE id = 0").fetchone()[0]
+
+# Index en mémoire (modes json et mongo) : id -> user (ordre d'insertion conservé)
+# et nom -> ids, pour des recherches en O(1) au lieu de parcourir la liste
+users_by_id = {}
+users_by_name = {}
+# ordre d'insertion pour la pagination : numéros croissants (bisect) et ids correspondants ;
+# un user supprimé laisse un trou (id None), retiré quand les trous dépassent les users
+_order_seqs = []
+_order_ids = []
+_order_holes = 0
+_last_seq = 0
+_user_seq = {}
+# versions : collection (change à chaque écriture) et dernière version de chaque user ;
+# jamais en dessous de l'heure courante (ms) : après un redémarrage, un ETag donné par
+# l'ancien processus ne peut pas coïncider avec la nouvelle numérotation
+users_version = int(time.time() * 1000)
+user_versions = {}
+_users_lock = threading.RLock()
+
+def _bump(userid):
+    global users_version
+    users_version = max(users_version + 1, int(time.time() * 1000))
+    if userid is not None:
+        user_versions[userid] = users_version
+
+def _index_name(user):
+    users_by_name.setdefault(user.get("name"), set()).add(str(user.get("id")))
+
+def _unindex_name(user):
+    ids = users_by_name.get(user.get("name"))
+    if ids is not None:
+        ids.discard(str(user.get("id")))
+        if not ids:
+            del users_by_name[user.get("name")]
+
+def _index_user(user):
+    uid = str(user.get("id"))
+    users_by_id[uid] = user
+    _index_name(user)
+    global _last_seq
+    # jamais réutilisé : un curseur reste valable même si son user a été supprimé
+    _last_seq += 1
+    _order_seqs.append(_last_seq)
+    _order_ids.append(uid)
+    _user_seq[uid] = _last_seq
+    _bump(uid)
+
+def _unindex_user(uid):
+    global _order_holes
+    user = users_by_id.pop(uid)
+    _unindex_name(user)
+    # trou au lieu d'un del en O(n) ; compactage amorti
+    _order_ids[bisect.bisect_left(_order_seqs, _user_seq.pop(uid))] = None
+    _order_holes += 1
+    if _order_holes > len(users_by_id):
+        _compact_order()
+    user_versions.pop(uid, None)
+    _bump(None)
+    return user
+
+def _compact_order():
+    global _order_seqs, _order_ids, _order_holes
+    live = [(seq, uid) for seq, uid in zip(_order_seqs, _order_ids) if uid is not None]
+    _order_seqs = [seq for seq, _ in live]
+    _order_ids = [uid for _, uid in live]
+    _order_holes = 0
+
+def reload_users(loaded):
+    """Reconstruit tous les index à partir de la liste relue, puis les échange d'un coup."""
+    global users_by_id, users_by_name, _order_seqs, _order_ids, _order_holes, _last_seq, _user_seq, user_versions
+    by_id, by_name, seqs, ids, seq_of = {}, {}, [], [], {}
+    for user in loaded:
+        uid = str(user.get("id"))
+        # id en double dans les données : le premier l'emporte, comme l'ancien parcours de liste
+        if uid in by_id:
+            continue
+        by_id[uid] = user
+        by_name.setdefault(user.get("name"), set()).add(uid)
+        seqs.append(len(seqs) + 1)
+        ids.append(uid)
+        seq_of[uid] = seqs[-1]
+    with _users_lock:
+        # versions toujours croissantes : les anciens ETag ne correspondent plus
+        _bump(None)
+        versions = {uid: users_version for uid in by_id}
+        users_by_id, users_by_name = by_id, by_name
+        _order_seqs, _order_ids, _user_seq, user_versions = seqs, ids, seq_of, versions
+        _order_holes, _last_seq = 0, len(seqs)
+
+if USE_SQLITE:
+    os.makedirs(os.path.dirname(SQLITE_PATH) or ".", exist_ok=True)
+    init_sqlite()
+elif USE_MONGO and _mongo_db is not None:
     try:
-        users = list(_mongo_db.users.find({}, {"_id": 0}))
+        reload_users(list(_mongo_db.users.find({}, {"_id": 0})))
     except Exception:
-        users = []
+        pass
 else:
-    users = _load_users_from_json()
-
-def write(users):
+    reload_users(_load_users_from_json())
+    # users.json modifié hors du service (bind mount) : index reconstruits sans redémarrer
+    watcher.watch(USERS_PATH, "users", reload_users, _users_lock)
+
+@timed(STORAGE_DURATION, "write")
+def write(changes):
+    """Persiste les users modifiés (id -> user, None = supprimé).
+
+    Mongo : un bulk_write des seuls users concernés. JSON : users.json est un seul
+    document (lu tel quel par l'import, l'export et la surveillance du fichier),
+    réécrit en entier à partir de l'index.
+    """
     if USE_MONGO and _mongo_db is not None:
         try:
-            _mongo_db.users.delete_many({})
-            if users:
-                _mongo_db.users.insert_many([u.copy() for u in users])
+            from pymongo import DeleteOne, ReplaceOne
+            _mongo_db.users.bulk_write([
+                DeleteOne({"id": uid}) if user is None else ReplaceOne({"id": uid}, user.copy(), upsert=True)
+                for uid, user in changes.items()
+            ], ordered=True)
             return
         except Exception:
             pass
-    _save_users_to_json(users)
+    _save_users_to_json(all_users())
 
 def name_to_id(name: str):
     return name.strip().lower().replace(" ", "_")
 
+def _sqlite_doc(doc):
+    """User lu dans SQLite, avec le last_active encore en attente dans ce worker (LAST_ACTIVE_FLUSH)."""
+    user = json.loads(doc)
+    if _activity is not None:
+        ts = _activity.last_active(str(user.get("id")))
+        if ts is not None and ts > (user.get("last_active") or 0):
+            user["last_active"] = ts
+    return user
+
 def find_user(userid):
-    for user in users:
-        if str(user.get("id")) == str(userid):
-            return user
-    return None
+    if USE_SQLITE:
+        row = sqlite_conn().execute("SELECT doc FROM users WHERE id = ?", (str(userid),)).fetchone()
+        return _sqlite_doc(row[0]) if row else None
+    return users_by_id.get(str(userid))
+
+def find_user_versioned(userid):
+    """(user, version de l'user) ou (None, None)."""
+    if USE_SQLITE:
+        row = sqlite_conn().execute("SELECT doc, version FROM users WHERE id = ?", (str(userid),)).fetchone()
+        if row is None:
+            return None, None
+        # touche en attente : l'ETag change tout de suite, pas seulement à l'écriture
+        pending = _activity.last_active(str(userid)) if _activity is not None else None
+        return _sqlite_doc(row[0]), (row[1] if pending is None else f"{row[1]}.{pending}")
+    with _users_lock:
+        user = users_by_id.get(str(userid))
+        return (user, user_versions.get(str(userid))) if user is not None else (None, None)
+
+def find_users_by_name(name):
+    if USE_SQLITE:
+        return [_sqlite_doc(doc) for (doc,) in sqlite_conn().execute(
+            "SELECT doc FROM users WHERE name = ? ORDER BY rowid", (name,))]
+    return [users_by_id[uid] for uid in users_by_name.get(name, ()) if uid in users_by_id]
+
+def all_users():
+    if USE_SQLITE:
+        return [_sqlite_doc(doc) for (doc,) in sqlite_conn().execute("SELECT doc FROM users ORDER BY rowid")]
+    return list(users_by_id.values())
+
+def collection_version():
+    if USE_SQLITE:
+        version = sqlite_conn().execute("SELECT version FROM users_meta WHERE id = 0").fetchone()[0]
+        # + génération des touches en attente dans ce worker
+        return version if _activity is None else f"{version}.{_activity.generation}"
+    return users_version
+
+def users_page(cursor, limit):
+    """Jusqu'à limit users après le curseur (ordre d'insertion), et le curseur suivant (None à la fin)."""
+    if USE_SQLITE:
+        rows = sqlite_conn().execute(
+            "SELECT rowid, doc FROM users WHERE rowid > ? ORDER BY rowid LIMIT ?", (cursor, limit + 1)
+        ).fetchall()
+        page = [_sqlite_doc(doc) for _, doc in rows[:limit]]
+        return page, (rows[limit - 1][0] if len(rows) > limit else None)
+    with _users_lock:
+        # limit + 1 users (trous sautés) : le dernier dit seulement s'il reste une page
+        found = []
+        i = bisect.bisect_right(_order_seqs, cursor)
+        while i < len(_order_ids) and len(found) <= limit:
+            if _order_ids[i] is not None:
+                found.append(i)
+            i += 1
+        page = [users_by_id[_order_ids[i]] for i in found[:limit]]
+        return page, (_order_seqs[found[limit - 1]] if len(found) > limit else None)
+
+def insert_user(user):
+    """Ajoute l'utilisateur, renvoie False si l'id existe déjà."""
+    if USE_SQLITE:
+        try:
+            with sqlite_transaction() as conn:
+                conn.execute(
+                    "INSERT INTO users (id, name, is_admin, last_active, doc, version) VALUES (?, ?, ?, ?, ?, ?)",
+                    _user_row(user) + (_sqlite_bump(conn),),
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+    with _users_lock:
+        if str(user["id"]) in users_by_id:
+            return False
+        _index_user(user)
+        write({str(user["id"]): user})
+    return True
+
+def modify_user(userid, changes):
+    """Applique changes(user) et sauvegarde, renvoie l'user modifié ou None."""
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            row = conn.execute("SELECT doc FROM users WHERE id = ?", (str(userid),)).fetchone()
+            if row is None:
+                return None
+            user = json.loads(row[0])
+            changes(user)
+            conn.execute(
+                "UPDATE users SET name = ?, is_admin = ?, last_active = ?, doc = ?, version = ? WHERE id = ?",
+                _user_row(user)[1:] + (_sqlite_bump(conn), str(userid)),
+            )
+        return user
+    with _users_lock:
+        user = find_user(userid)
+        if user is None:
+            return None
+        _unindex_name(user)
+        changes(user)
+        _index_name(user)
+        _bump(str(userid))
+        write({str(userid): user})
+    return user
+
+def remove_user(userid):
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            row = conn.execute("SELECT doc FROM users WHERE id = ?", (str(userid),)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM users WHERE id = ?", (str(userid),))
+            _sqlite_bump(conn)
+        return json.loads(row[0])
+    with _users_lock:
+        if str(userid) not in users_by_id:
+            return None
+        user = _unindex_user(str(userid))
+        write({str(userid): None})
+    return user
+
+# ---------- last_active : écritures différées (write-behind) ----------
+
+@timed(STORAGE_DURATION, "save_last_active")
+def save_last_active(touches):
+    """Écrit en une fois les last_active en attente (userid -> timestamp), sans jamais reculer."""
+    if USE_SQLITE:
+        with sqlite_transaction() as conn:
+            version = None
+            for userid, ts in touches.items():
+                row = conn.execute("SELECT doc FROM users WHERE id = ?", (userid,)).fetchone()
+                if row is None:
+                    continue
+                user = json.loads(row[0])
+                if (user.get("last_active") or 0) >= ts:
+                    continue
+                user["last_active"] = ts
+                if version is None:
+                    version = _sqlite_bump(conn)
+                conn.execute(
+                    "UPDATE users SET last_active = ?, doc = ?, version = ? WHERE id = ?",
+                    (ts, json.dumps(user, ensure_ascii=False), version, userid),
+                )
+        return
+    # json / mongo : les users en mémoire sont déjà à jour, seule l'écriture était différée
+    if USE_MONGO and _mongo_db is not None:
+        try:
+            from pymongo import UpdateOne
+            _mongo_db.users.bulk_write([
+                UpdateOne({"id": userid, "last_active": {"$not": {"$gte": ts}}}, {"$set": {"last_active": ts}})
+                for userid, ts in touches.items()
+            ], ordered=False)
+            return
+        except Exception:
+            pass
+    with _users_lock:
+        write({userid: users_by_id[userid] for userid in touches if userid in users_by_id})
+
+
+class ActivityBuffer:
+    """Garde en mémoire le dernier last_active de chaque user et l'écrit toutes les `interval` secondes.
+
+    Plusieurs touches du même user entre deux écritures n'en font qu'une. En SQLite, les
+    lectures de ce worker voient les touches en attente (_sqlite_doc, last_active) et
+    `generation` entre dans l'ETag de la collection.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = {}
+        # touches en cours d'écriture : encore visibles jusqu'à la fin de save_last_active
+        self.flushing = {}
+        # jamais sous l'heure courante (ms), comme users_version
+        self.generation = int(time.time() * 1000)
+        self._lock = threading.Lock()
+        threading.Thread(target=self.run, name="last-active-flush", daemon=True).start()
+        # arrêt du service : on écrit ce qui reste
+        atexit.register(self.flush)
+
+    def touch(self, userid, ts):
+        with self._lock:
+            if ts > self.pending.get(userid, 0):
+                self.pending[userid] = ts
+                self.generation = max(self.generation + 1, int(time.time() * 1000))
+
+    def last_active(self, userid):
+        """Dernière touche pas encore écrite pour cet user, ou None."""
+        pending, flushing = self.pending.get(userid), self.flushing.get(userid)
+        if pending is None or flushing is None:
+            return flushing if pending is None else pending
+        return max(pending, flushing)
+
+    def flush(self):
+        with self._lock:
+            # flushing avant pending : une lecture sans verrou trouve la touche dans l'un des deux
+            touches = self.flushing = self.pending
+            self.pending = {}
+        if touches:
+            try:
+                save_last_active(touches)
+            except Exception as e:
+                print(f"last_active: failed to save {len(touches)} users, will retry: {e}")
+                with self._lock:
+                    for userid, ts in touches.items():
+                        if ts > self.pending.get(userid, 0):
+                            self.pending[userid] = ts
+        with self._lock:
+            self.flushing = {}
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+_activity = ActivityBuffer(LAST_ACTIVE_FLUSH) if LAST_ACTIVE_FLUSH > 0 else None
+
+
+def touch_user(userid, ts=None):
+    """Met à jour last_active ; renvoie l'user (avec la nouvelle valeur) ou None s'il n'existe pas."""
+    ts = ts or int(time.time())
+    if _activity is None:
+        return modify_user(userid, lambda user: user.update(last_active=ts))
+    if USE_SQLITE:
+        user = find_user(userid)
+        if user is None:
+            return None
+        # visible tout de suite dans ce worker (_sqlite_doc, ETag),
+        # par les autres workers après la prochaine écriture (LAST_ACTIVE_FLUSH)
+        user["last_active"] = max(ts, user.get("last_active") or 0)
+    else:
+        with _users_lock:
+            user = users_by_id.get(str(userid))
+            if user is None:
+                return None
+            if ts > (user.get("last_active") or 0):
+                user["last_active"] = ts
+                _bump(str(userid))
+    _activity.touch(str(userid), ts)
+    return user
+
+
+def admin_flags(userids):
+    """id -> is_admin pour tous les ids demandés (inconnu -> False)."""
+    ids = [str(uid) for uid in dict.fromkeys(userids)]
+    if USE_SQLITE:
+        flags = dict.fromkeys(ids, False)
+        conn = sqlite_conn()
+        # par paquets : limite du nombre de paramètres SQLite
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for uid, admin in conn.execute(
+                f"SELECT id, is_admin FROM users WHERE id IN ({placeholders})", chunk
+            ):
+                flags[uid] = bool(admin)
+        return flags
+    return {uid: bool((users_by_id.get(uid) or {}).get("is_admin", False)) for uid in ids}
+
+def admin_ids():
+    if USE_SQLITE:
+        return [uid for (uid,) in sqlite_conn().execute("SELECT id FROM users WHERE is_admin = 1 ORDER BY rowid")]
+    return [uid for uid, user in users_by_id.items() if user.get("is_admin", False)]
 
 
 def is_admin(userid):
@@ -69,9 +526,49 @@ def is_admin(userid):
     return bool(user.get("is_admin", False))
 
 
+def parse_fields(raw):
+    """fields=id,name -> ["id", "name"] ; absent -> None (tous les champs)."""
+    if raw is None:
+        return None
+    return [f.strip() for f in raw.split(",") if f.strip()]
+
+
+def etag_matches(etag):
+    """If-None-Match correspond à l'ETag courant (compté dans cache_hit_ratio{cache="etag"})."""
+    if not request.if_none_match:
+        return False
+    hit = request.if_none_match.contains(etag)
+    cache_lookup("etag", hit)
+    return hit
+
+
+# paramètres qui changent le corps de GET /users : chaque variante a son propre ETag
+REPRESENTATION_ARGS = ("name", "fields", "limit", "cursor")
+
+
+def representation_etag(base):
+    """ETag de la collection + empreinte des paramètres : ?fields=id et la liste complète,
+    ou deux pages différentes, ne partagent pas le même ETag fort."""
+    variant = [(k, request.args.get(k)) for k in REPRESENTATION_ARGS if k in request.args]
+    if not variant:
+        return base
+    return f"{base}-{hashlib.sha1(repr(variant).encode()).hexdigest()[:12]}"
+
+
+def not_modified(etag):
+    resp = make_response("", 304)
+    resp.set_etag(etag)
+    return resp
+
+
 #Route
 # objet -> utiliser array
 
+@app.before_request
+def track_activity():
+    if TRACK_ACTIVITY and request.headers.get("X-User-Id"):
+        touch_user(request.headers["X-User-Id"])
+
 @app.route("/", methods=['GET'])
 def profil():
    return "<h1 style='color:blue'> "+ str(USE_MONGO) +" Welcome to the User service!</h1>"
@@ -93,12 +590,8 @@ def add_user():
     req["last_active"] = int(time.time())
     req["is_admin"] = True
 
-    for user in users:
-        if user["id"] == user_id:
-            return make_response(jsonify({"error": "user ID already exists"}), 409)
-
-    users.append(req)
-    write(users)
+    if not insert_user(req):
+        return make_response(jsonify({"error": "user ID already exists"}), 409)
     
     #jsonify qui permet de créer une réponse HTTP à partir d’un format JSON
     return make_response(jsonify({
@@ -122,16 +615,50 @@ def get_all_users():
     if not is_admin(caller_id):
         return make_response(jsonify({"error": "admin only"}), 403)
 
-    return make_response(jsonify(users), 200)
-
+    # ETag = version de la collection (+ paramètres) : rien n'a changé -> 304 sans relire ni sérialiser
+    etag = representation_etag(f"users-{collection_version()}")
+    if etag_matches(etag):
+        return not_modified(etag)
+
+    fields = parse_fields(request.args.get("fields"))
+    next_cursor = None
+    # ?name=... : seulement les utilisateurs portant ce nom (index par nom)
+    name = request.args.get("name")
+    if name is not None:
+        result = find_users_by_name(name)
+    elif "limit" in request.args or "cursor" in request.args:
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            cursor = int(request.args.get("cursor", 0))
+        except ValueError:
+            return make_response(jsonify({"error": "'limit' and 'cursor' must be integers"}), 400)
+        if not 1 <= limit <= MAX_PAGE_SIZE or cursor < 0:
+            return make_response(jsonify({"error": f"'limit' must be between 1 and {MAX_PAGE_SIZE}, 'cursor' >= 0"}), 400)
+        result, next_cursor = users_page(cursor, limit)
+    else:
+        result = all_users()
+
+    if fields is not None:
+        result = [{k: u[k] for k in fields if k in u} for u in result]
+    resp = make_response(jsonify(result), 200)
+    resp.set_etag(etag)
+    if next_cursor is not None:
+        # page suivante : même requête avec cursor=<X-Next-Cursor>
+        resp.headers["X-Next-Cursor"] = str(next_cursor)
+    return resp
 
 
 @app.route("/users/<userid>", methods=['GET'])
 def get_user(userid):
     """Renvoie un utilisateur précis selon son ID"""
-    for user in users:
-        if str(user["id"]) == str(userid):
-            return make_response(jsonify(user), 200)
+    user, version = find_user_versioned(userid)
+    if user is not None:
+        etag = f"{userid}-{version}"
+        if etag_matches(etag):
+            return not_modified(etag)
+        resp = make_response(jsonify(user), 200)
+        resp.set_etag(etag)
+        return resp
     return make_response(jsonify({"error": "user ID not found"}), 404)
 
 
@@ -146,24 +673,42 @@ def check_user_admin(userid):
     return make_response(jsonify({"is_admin": bool(user.get("is_admin", False))}), 200)
 
 
+@app.route("/users/admin:batch", methods=["POST"])
+def check_users_admin_batch():
+    """Statut admin de plusieurs utilisateurs en une requête : {"ids": [...]} -> {id: is_admin}"""
+    req = request.get_json(silent=True) or {}
+    ids = req.get("ids")
+    if not isinstance(ids, list) or not all(isinstance(uid, str) for uid in ids):
+        return make_response(jsonify({"error": "'ids' must be a list of strings"}), 400)
+    if len(ids) > MAX_BATCH_IDS:
+        return make_response(jsonify({"error": f"at most {MAX_BATCH_IDS} ids per request"}), 400)
+
+    return make_response(jsonify(admin_flags(ids)), 200)
+
+
+@app.route("/users/admin:export", methods=["GET"])
+def export_admin_ids():
+    """Ids de tous les admins, pour pré-remplir un cache en une requête"""
+    ids = admin_ids()
+    return make_response(jsonify({"admin_ids": ids, "count": len(ids)}), 200)
+
+
 #UPDATE
 
 @app.route("/users/<userid>", methods=['PUT'])
 def update_user(userid):
     payload = request.get_json(silent=True) or {}
 
-    # On cherche l'user
-    for user in users:
-        if str(user["id"]) == str(userid):
-
-            # Met à jour seulement les champs présents dans le JSON
-            if "name" in payload:
-                user["name"] = payload["name"]
-
-            user["last_active"] = int(time.time())
-            write(users)
+    def changes(user):
+        # Met à jour seulement les champs présents dans le JSON
+        if "name" in payload:
+            user["name"] = payload["name"]
+        user["last_active"] = int(time.time())
 
-            return make_response(jsonify(user), 200)
+    # sans autre champ, seul last_active change : écriture différée
+    user = modify_user(userid, changes) if "name" in payload else touch_user(userid)
+    if user is not None:
+        return make_response(jsonify(user), 200)
 
     return make_response(jsonify({"error": "user ID not found"}), 404)
 
@@ -172,15 +717,15 @@ def update_user(userid):
 
 @app.route("/users/<userid>", methods=['DELETE'])
 def del_user(userid):
-   for user in users:
-      if str(user["id"]) == str(userid):
-         users.remove(user)
-         write(users) 
-         return make_response(jsonify(user),200)
+   user = remove_user(userid)
+   if user is not None:
+      return make_response(jsonify(user),200)
 
    return make_response(jsonify({"error": "user ID not found"}), 404)
 
 
 if __name__ == "__main__":
+   # docker stop (SIGTERM) : sortie normale pour que atexit écrive les last_active en attente
+   signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
    print("Server running in port %s"%(PORT))
    app.run(host=HOST, port=PORT)